@@ -0,0 +1,230 @@
+"""
+事件匯流排模組
+將警告音、主控台訊息、外部 hook、檔案通知與記錄檔寫入等副作用移到背景執行緒，
+影格迴圈只負責發布事件，不會被任何處理器阻塞
+"""
+
+import json
+import queue
+import subprocess
+import threading
+import time
+import urllib.request
+from datetime import datetime
+
+from config import ACTION_QUEUE_SIZE, ACTION_HOOK_TIMEOUT
+
+# 事件種類
+EVENT_VIOLATION = 'violation'                # 記錄一次不雅手勢
+EVENT_FACE_MOSAIC = 'face_mosaic_enabled'    # 臉部馬賽克啟動
+EVENT_PENALTY_CHANGED = 'penalty_changed'    # 懲罰等級改變
+
+ALL_EVENTS = '*'
+
+
+class ActionEvent:
+    """單一事件"""
+
+    __slots__ = ('kind', 'data', 'timestamp')
+
+    def __init__(self, kind, data):
+        self.kind = kind
+        self.data = data
+        self.timestamp = time.time()
+
+    def to_dict(self):
+        return {
+            'event': self.kind,
+            'time': datetime.fromtimestamp(self.timestamp).isoformat(),
+            **self.data,
+        }
+
+
+class ActionBus:
+    """有上限的事件佇列 + 單一背景工作執行緒；佇列滿時直接丟棄並計數
+
+    除了事件，也可以用 defer() 交付一般工作（例如寫檔），與事件依序在同一個執行緒執行。
+    """
+
+    def __init__(self, queue_size=ACTION_QUEUE_SIZE):
+        """
+        Args:
+            queue_size: 事件佇列上限（背壓：超過即丟棄，不會阻塞發布端）
+        """
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._handlers = {}
+        self._thread = None
+
+        # 統計資訊
+        self.published = 0
+        self.dropped = 0
+        self.handled = 0
+        self.handler_errors = 0
+        self.deferred = 0
+
+    def subscribe(self, kind, handler):
+        """
+        註冊事件處理器
+
+        Args:
+            kind: 事件種類，ALL_EVENTS 代表所有事件
+            handler: 接收 ActionEvent 的可呼叫物件
+        """
+        self._handlers.setdefault(kind, []).append(handler)
+        return self
+
+    def publish(self, kind, **data):
+        """
+        發布事件（永不阻塞）
+
+        Returns:
+            bool: 是否成功放入佇列
+        """
+        try:
+            self._queue.put_nowait(ActionEvent(kind, data))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.published += 1
+        return True
+
+    def defer(self, func, *args):
+        """
+        把一般工作交給背景執行緒（永不阻塞，佇列滿時丟棄並計數）
+
+        Returns:
+            bool: 是否成功放入佇列
+        """
+        try:
+            self._queue.put_nowait((func, args))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.deferred += 1
+        return True
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name='action-bus', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """停止工作執行緒，盡量處理完佇列中剩餘的事件"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _worker(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                break
+            if isinstance(event, tuple):
+                func, args = event
+                try:
+                    func(*args)
+                except Exception as e:
+                    self.handler_errors += 1
+                    print(f"背景工作失敗: {e}")
+                continue
+            handlers = self._handlers.get(event.kind, []) + self._handlers.get(ALL_EVENTS, [])
+            for handler in handlers:
+                try:
+                    handler(event)
+                except Exception as e:
+                    self.handler_errors += 1
+                    print(f"事件處理失敗 ({event.kind}): {e}")
+            self.handled += 1
+
+    def get_statistics(self):
+        """獲取統計資訊"""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'published': self.published,
+            'dropped': self.dropped,
+            'handled': self.handled,
+            'deferred': self.deferred,
+            'handler_errors': self.handler_errors,
+        }
+
+
+# ==================== 內建處理器 ====================
+
+def format_event(event):
+    """將事件轉成主控台訊息"""
+    data = event.data
+    if event.kind == EVENT_VIOLATION:
+        message = f"[警告] 偵測到不雅手勢: {data['gesture']} (今日第 {data['count']} 次)"
+        if data.get('clip'):
+            message += f" 影片: {data['clip']}"
+        return message
+    if event.kind == EVENT_FACE_MOSAIC:
+        return (f"\n{'='*60}\n"
+                f"!!! 警告：不雅手勢次數已達 {data['threshold']} 次！啟動臉部馬賽克功能 !!!\n"
+                f"{'='*60}\n")
+    if event.kind == EVENT_PENALTY_CHANGED:
+        return f"[懲罰] 等級變更: {data['previous_level']} -> {data['penalty_level']}"
+    return f"[事件] {event.kind}: {data}"
+
+
+def console_log_handler(event):
+    """在主控台輸出事件訊息"""
+    print(format_event(event))
+
+
+def warning_beep_handler(event):
+    """進入 high_warning 時嗶一聲（Windows 有效，其他平台就略過）"""
+    if event.data.get('penalty_level') != 'high_warning':
+        return
+    try:
+        import winsound
+        winsound.Beep(1000, 200)
+    except Exception:
+        pass
+
+
+class FileNotifier:
+    """將事件以 JSON Lines 格式附加到檔案"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, event):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event.to_dict(), ensure_ascii=False) + '\n')
+
+
+class CommandHook:
+    """將事件以 JSON 送到本機 webhook（HTTP POST）或外部指令（stdin）"""
+
+    def __init__(self, url=None, command=None, timeout=ACTION_HOOK_TIMEOUT):
+        """
+        Args:
+            url: webhook 網址，例如 http://127.0.0.1:9000/events
+            command: 外部指令（list 或字串），事件 JSON 從 stdin 傳入
+            timeout: 單次呼叫的逾時秒數
+        """
+        self.url = url
+        self.command = command
+        self.timeout = timeout
+
+    def __call__(self, event):
+        payload = json.dumps(event.to_dict(), ensure_ascii=False).encode('utf-8')
+        if self.url:
+            request = urllib.request.Request(
+                self.url, data=payload, headers={'Content-Type': 'application/json'}
+            )
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+        if self.command:
+            subprocess.run(
+                self.command, input=payload, timeout=self.timeout,
+                shell=isinstance(self.command, str), check=False,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
@@ -0,0 +1,148 @@
+"""
+多行程影格交換效能測試
+比較共享記憶體影格匯流排（SharedFrameRing）與 multiprocessing.Queue（pickle 複製）的吞吐量
+
+用法：
+    python bench_frame_bus.py --frames 2000
+    python bench_frame_bus.py --frames 2000 --profile   # 每個生產者 / 消費者行程各自輸出報告
+"""
+
+import argparse
+import multiprocessing as mp
+import time
+
+import numpy as np
+
+from frame_bus import SharedFrameRing
+from profiler import ProfileSession
+from config import FRAME_WIDTH, FRAME_HEIGHT, FRAME_BUS_SLOTS, PROFILE_DIR, PROFILE_FRAME_BUS_MODULES
+
+
+def _touch(frame):
+    """模擬消費者讀取影格（取樣部分像素，避免測到的是運算成本）"""
+    return int(frame[::64, ::64, 0].sum())
+
+
+def _profiled(name, frames, target, *args):
+    """在子行程中以 ProfileSession 執行 target（工作都在子行程裡，主行程只在等待）"""
+    with ProfileSession(f'bench_frame_bus-{name}', modules=PROFILE_FRAME_BUS_MODULES) as session:
+        target(*args)
+        session.frames = frames
+
+
+def _process(target, args, name, frames, profile):
+    if profile:
+        return mp.Process(target=_profiled, args=(name, frames, target) + args)
+    return mp.Process(target=target, args=args)
+
+
+# ==================== 共享記憶體 ====================
+
+def _ring_producer(spec, frames, template):
+    ring = SharedFrameRing.attach(**spec)
+    try:
+        for i in range(frames):
+            seq, view = ring.claim()
+            np.copyto(view, template)   # 模擬擷取端直接寫入 slot
+            view[0, 0, 0] = i & 0xFF
+            ring.publish(seq)
+        ring.close_stream()
+    finally:
+        ring.close()
+
+
+def _ring_consumer(spec, result):
+    ring = SharedFrameRing.attach(**spec)
+    received = checksum = 0
+    try:
+        seq = 0
+        while ring.wait_for(seq):
+            frame = ring.view(seq)
+            if frame is not None:
+                checksum += _touch(frame)
+                received += 1
+            ring.ack(0, seq)
+            seq += 1
+    finally:
+        frame = None
+        ring.close()
+    result.put((received, checksum))
+
+
+def bench_ring(frames, shape, slots, profile=False):
+    ring = SharedFrameRing(shape=shape, capacity=slots, consumers=1)
+    template = np.random.default_rng(0).integers(0, 255, size=shape, dtype=np.uint8)
+    result = mp.Queue()
+    try:
+        consumer = _process(_ring_consumer, (ring.spec(), result), 'ring-consumer', frames, profile)
+        producer = _process(_ring_producer, (ring.spec(), frames, template), 'ring-producer', frames, profile)
+        consumer.start()
+        start = time.perf_counter()
+        producer.start()
+        received, _ = result.get()
+        elapsed = time.perf_counter() - start
+        producer.join()
+        consumer.join()
+    finally:
+        ring.close()
+    return received, elapsed
+
+
+# ==================== multiprocessing.Queue ====================
+
+def _queue_producer(queue, frames, template):
+    for i in range(frames):
+        frame = template.copy()         # 模擬擷取端產生新影格
+        frame[0, 0, 0] = i & 0xFF
+        queue.put(frame)
+    queue.put(None)
+
+
+def _queue_consumer(queue, result):
+    received = checksum = 0
+    while True:
+        frame = queue.get()
+        if frame is None:
+            break
+        checksum += _touch(frame)
+        received += 1
+    result.put((received, checksum))
+
+
+def bench_queue(frames, shape, slots, profile=False):
+    queue = mp.Queue(maxsize=slots)
+    template = np.random.default_rng(0).integers(0, 255, size=shape, dtype=np.uint8)
+    result = mp.Queue()
+    consumer = _process(_queue_consumer, (queue, result), 'queue-consumer', frames, profile)
+    producer = _process(_queue_producer, (queue, frames, template), 'queue-producer', frames, profile)
+    consumer.start()
+    start = time.perf_counter()
+    producer.start()
+    received, _ = result.get()
+    elapsed = time.perf_counter() - start
+    producer.join()
+    consumer.join()
+    return received, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多行程影格交換效能測試')
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--width', type=int, default=FRAME_WIDTH)
+    parser.add_argument('--height', type=int, default=FRAME_HEIGHT)
+    parser.add_argument('--slots', type=int, default=FRAME_BUS_SLOTS)
+    parser.add_argument('--profile', action='store_true',
+                        help=f'效能分析模式：每個生產者 / 消費者行程各自輸出熱點報告到 {PROFILE_DIR}/')
+    args = parser.parse_args()
+
+    shape = (args.height, args.width, 3)
+    frame_mb = np.prod(shape) / 1e6
+    print(f"影格 {args.width} x {args.height}（{frame_mb:.2f} MB），共 {args.frames} 幀，緩衝 {args.slots} 幀")
+    for label, bench in (('shared memory ring', bench_ring), ('multiprocessing.Queue', bench_queue)):
+        received, elapsed = bench(args.frames, shape, args.slots, profile=args.profile)
+        fps = received / elapsed if elapsed > 0 else 0.0
+        print(f"{label:>22}: {fps:8.1f} fps  {fps * frame_mb:8.1f} MB/s  ({received} 幀, {elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+偵測解析度效能測試
+在多個縮放比例下執行手部偵測，比較延遲與精準度（相對於全解析度偵測結果）
+
+用法：
+    python bench_inference_scale.py --source video:clip.mp4 --scales 1.0,0.75,0.5,0.33
+    python bench_inference_scale.py --source video:clip.mp4 --profile
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+import mediapipe as mp
+
+from frame_source import open_source
+from gesture_recognizer import GestureRecognizer
+from hand_detection import HandDetectionPool
+from profiler import ProfileSession
+from config import (
+    MODEL_COMPLEXITY, MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE, MAX_NUM_HANDS,
+)
+
+
+class _ScaleRun:
+    """單一縮放比例的偵測器與統計"""
+
+    def __init__(self, scale, frame_w, frame_h):
+        self.scale = scale
+        self.size = (max(1, round(frame_w * scale)), max(1, round(frame_h * scale)))
+        self.hands = mp.solutions.hands.Hands(
+            max_num_hands=MAX_NUM_HANDS,
+            model_complexity=MODEL_COMPLEXITY,
+            min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+        )
+        self.pool = HandDetectionPool()
+        self.latencies = []
+        self.detected_frames = 0
+        self.count_matches = 0
+        self.label_matches = 0
+        self.label_total = 0
+        self.pixel_errors = []
+
+    def detect(self, img):
+        """縮小後偵測，回傳投影回原解析度的 (N, 21, 2) 座標"""
+        h, w = img.shape[:2]
+        start = time.perf_counter()
+        small = img if self.size == (w, h) else cv2.resize(img, self.size, interpolation=cv2.INTER_AREA)
+        results = self.hands.process(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+        self.latencies.append(time.perf_counter() - start)
+        detections = self.pool.extract(results.multi_hand_landmarks, w, h)
+        if detections:
+            self.detected_frames += 1
+        return self.pool.points[:len(detections)]
+
+    def close(self):
+        self.hands.close()
+
+
+def run_benchmark(source, scales, max_frames):
+    recognizer = GestureRecognizer()
+    runs = None
+    frames = 0
+
+    while frames < max_frames:
+        ret, img = source.read()
+        if not ret:
+            break
+        if runs is None:
+            h, w = img.shape[:2]
+            runs = [_ScaleRun(s, w, h) for s in scales]
+
+        outputs = [run.detect(img) for run in runs]
+        reference = outputs[0]
+        reference_labels = recognizer.classify_batch(reference)
+        for run, points in zip(runs, outputs):
+            if len(points) != len(reference):
+                continue
+            run.count_matches += 1
+            if len(points) == 0:
+                continue
+            # 依手腕位置排序後配對，避免兩隻手順序不同
+            ref_order = np.argsort(reference[:, 0, 0])
+            order = np.argsort(points[:, 0, 0])
+            diff = points[order].astype(np.float64) - reference[ref_order]
+            run.pixel_errors.append(float(np.linalg.norm(diff, axis=2).mean()))
+            labels = recognizer.classify_batch(points)
+            run.label_matches += int((labels[order] == reference_labels[ref_order]).sum())
+            run.label_total += len(points)
+        frames += 1
+
+    source.release()
+    if runs is None:
+        print("錯誤：影像來源沒有任何影格")
+        return [], 0
+
+    rows = []
+    for run in runs:
+        lat = np.array(run.latencies) * 1000
+        rows.append({
+            'scale': run.scale,
+            'size': f"{run.size[0]}x{run.size[1]}",
+            'mean_ms': float(lat.mean()),
+            'p95_ms': float(np.percentile(lat, 95)),
+            'detect_rate': run.detected_frames / frames,
+            'count_agreement': run.count_matches / frames,
+            'mean_px_error': float(np.mean(run.pixel_errors)) if run.pixel_errors else float('nan'),
+            'label_agreement': run.label_matches / run.label_total if run.label_total else float('nan'),
+        })
+        run.close()
+    return rows, frames
+
+
+def print_report(rows, frames):
+    print(f"\n共 {frames} 幀；精準度以第一個比例的結果為基準（建議為 1.0）")
+    print(f"{'scale':>6} {'size':>10} {'mean ms':>8} {'p95 ms':>8} {'detect':>7} "
+          f"{'count=':>7} {'px err':>7} {'label=':>7}")
+    for r in rows:
+        print(f"{r['scale']:>6.2f} {r['size']:>10} {r['mean_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['detect_rate']:>7.1%} {r['count_agreement']:>7.1%} "
+              f"{r['mean_px_error']:>7.2f} {r['label_agreement']:>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='偵測解析度效能測試')
+    parser.add_argument('--source', default='camera',
+                        help="影像來源：camera[:index]、video:<path>、images:<dir>")
+    parser.add_argument('--scales', default='1.0,0.75,0.5,0.33',
+                        help='以逗號分隔的縮放比例，第一個作為精準度基準')
+    parser.add_argument('--frames', type=int, default=300, help='最多測試的幀數')
+    parser.add_argument('--profile', action='store_true', help='同時輸出效能分析報告')
+    args = parser.parse_args()
+
+    scales = [float(s) for s in args.scales.split(',')]
+    source = open_source(args.source, prefetch=0)
+    if not source.isOpened():
+        print("錯誤：無法開啟影像來源")
+        return
+
+    if args.profile:
+        with ProfileSession('bench_inference_scale') as session:
+            rows, frames = run_benchmark(source, scales, args.frames)
+            session.frames = frames
+    else:
+        rows, frames = run_benchmark(source, scales, args.frames)
+    if rows:
+        print_report(rows, frames)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,20 @@
 CAMERA_INDEX = 0  # 攝影機編號，0 為預設攝影機
 FRAME_WIDTH = 720  # 影像寬度
 FRAME_HEIGHT = 540  # 影像高度
+CAMERA_FPS = 30  # 向攝影機要求的 FPS
+CAMERA_FOURCC = 'MJPG'  # 向攝影機要求的像素格式（None 表示使用驅動預設）
+FRAME_PREFETCH_SIZE = 2  # 背景預讀緩衝區大小，0 表示不預讀
+
+# 偵測解析度：手部與臉部偵測在此尺寸的縮小影像上執行，結果再投影回原解析度
+# （建議與 FRAME_WIDTH x FRAME_HEIGHT 保持相同長寬比）
+INFERENCE_WIDTH = FRAME_WIDTH
+INFERENCE_HEIGHT = FRAME_HEIGHT
+
+# ==================== 多行程影格匯流排設置 ====================
+# 共享記憶體環形緩衝區的 slot 數
+FRAME_BUS_SLOTS = 8
+# 等待新影格 / 空 slot 時的輪詢間隔（秒）
+FRAME_BUS_POLL_INTERVAL = 0.0002
 
 # ==================== MediaPipe 設置 ====================
 # 模型複雜度：0(最快), 1(較準確但較慢)
@@ -10,6 +24,34 @@ MODEL_COMPLEXITY = 0
 MIN_DETECTION_CONFIDENCE = 0.5
 # 手部追蹤信心閾值 (0.0 ~ 1.0)
 MIN_TRACKING_CONFIDENCE = 0.5
+# 同時偵測的手數上限（多人同框時調高）
+MAX_NUM_HANDS = 2
+
+# ==================== 偵測後端設置 ====================
+# 'legacy'：mp.solutions 同步偵測（每幀阻塞到偵測完成）
+# 'live_stream'：MediaPipe Tasks LIVE_STREAM 模式，送出影格後立即返回，以回呼取得的最新結果繪製
+DETECTION_BACKEND = 'legacy'
+# Tasks 模型檔（live_stream 後端使用，需自行下載）
+HAND_LANDMARKER_MODEL = 'models/hand_landmarker.task'
+FACE_DETECTOR_MODEL = 'models/blaze_face_short_range.tflite'
+# 非同步結果最多可沿用多久（毫秒，從最後一次確認畫面沒變時起算），超過就視為沒有偵測到
+DETECTION_RESULT_MAX_AGE_MS = 200
+
+# ==================== 動態閘門設置 ====================
+# 畫面靜止時跳過手部 / 臉部偵測，沿用上一次的結果
+MOTION_GATE_ENABLED = True
+# 差分網格每格的邊長（像素，每格取區域平均；720 x 540 時為 80 x 60 格）
+MOTION_CELL_SIZE = 9
+# 任一格灰階差異超過此值（0 ~ 255）即視為有動態
+MOTION_CELL_THRESHOLD = 6
+# 最多連續跳過幾幀就強制重新偵測
+MOTION_REFRESH_INTERVAL = 10
+
+# ==================== 多手追蹤設置 ====================
+# 跨幀配對允許的最大手部中心距離（相對於影像對角線）
+TRACK_MAX_DISTANCE_RATIO = 0.15
+# 追蹤連續幾幀未出現就釋放
+TRACK_MAX_MISSED_FRAMES = 5
 
 # ==================== 手勢識別參數 ====================
 # 手指彎曲判定閾值（角度小於此值視為伸直，大於等於此值視為彎曲）
@@ -60,6 +102,12 @@ WARNING_BG_PADDING = 6
 # 文字顯示位置
 TEXT_POSITION = (30, 120)
 
+# 手部骨架繪製（正式輸出可關閉，執行中按 SKELETON_TOGGLE_KEY 切換）
+DRAW_SKELETON = True
+SKELETON_TOGGLE_KEY = 's'
+SKELETON_LINE_THICKNESS = 2
+SKELETON_POINT_RADIUS = 5
+
 # ==================== 後台追蹤設置 ====================
 # 觸發臉部馬賽克的不雅手勢次數閾值
 BAD_GESTURE_THRESHOLD = 5
@@ -67,6 +115,63 @@ BAD_GESTURE_THRESHOLD = 5
 # 手勢追蹤記錄檔案
 GESTURE_LOG_FILE = 'gesture_log.json'
 
+# ==================== 懲罰引擎設置 ====================
+# 滑動時間窗 {名稱: 秒數}
+PENALTY_WINDOWS = {
+    '10min': 10 * 60,
+    '24h': 24 * 60 * 60,
+}
+
+# 時間桶大小（秒），決定時間窗過期的精度
+PENALTY_BUCKET_SECONDS = 10
+
+# 衰減分數半衰期（秒），可在等級設定中以 'decay' 作為時間窗名稱使用
+PENALTY_DECAY_HALF_LIFE = 60 * 60
+
+# 懲罰等級 (等級, 時間窗, 門檻)：由嚴重到輕微排列，第一個達到門檻者生效
+PENALTY_TIERS = (
+    ('shutdown', '24h', BAD_GESTURE_THRESHOLD * 2),
+    ('high_warning', '24h', BAD_GESTURE_THRESHOLD),
+    ('high_warning', '10min', 3),
+)
+
+# ==================== 事件通知設置 ====================
+# 事件佇列上限（滿了直接丟棄，不會拖慢影格迴圈）
+ACTION_QUEUE_SIZE = 256
+
+# 事件紀錄檔（JSON Lines），None 表示不寫檔
+ACTION_EVENT_LOG_FILE = None
+
+# 本機 webhook 網址與外部指令（事件 JSON 由 POST body / stdin 傳入），None 表示停用
+ACTION_WEBHOOK_URL = None
+ACTION_COMMAND = None
+
+# webhook / 外部指令逾時秒數
+ACTION_HOOK_TIMEOUT = 2.0
+
+# ==================== 違規影像證據設置 ====================
+# 是否在記錄違規時輸出前後數秒的影片
+EVIDENCE_ENABLED = False
+
+# 影片輸出資料夾
+EVIDENCE_DIR = 'evidence'
+
+# 違規前保留秒數 / 違規後繼續錄製秒數
+EVIDENCE_PRE_SECONDS = 3.0
+EVIDENCE_POST_SECONDS = 2.0
+
+# 預估的最高影格速率與額外緩衝影格數（只用來決定緩衝區大小，
+# 前後秒數與輸出影片 FPS 依影格時間戳計算）
+# 原始影格記憶體約為 (秒數 * FPS + 額外影格) * 寬 * 高 * 3 bytes
+EVIDENCE_FPS = CAMERA_FPS
+EVIDENCE_SLACK_FRAMES = 15
+
+# JPEG 壓縮品質（None 表示保存原始影格；設定後記憶體大幅降低，但每幀多一次編碼）
+EVIDENCE_JPEG_QUALITY = None
+
+# 輸出影片編碼
+EVIDENCE_FOURCC = 'mp4v'
+
 # ==================== 臉部偵測與馬賽克設置 ====================
 # 臉部偵測參數 (MediaPipe)
 FACE_DETECTION_MIN_CONFIDENCE = 0.5
@@ -81,6 +186,43 @@ FACE_MOSAIC_WARNING_COLOR = (0, 0, 255)  # 紅色
 FACE_MOSAIC_WARNING_FONT_SCALE = 0.8
 FACE_MOSAIC_WARNING_THICKNESS = 2
 
+# ==================== MJPEG 串流設置 ====================
+# 啟動時是否開啟本機 MJPEG 串流（也可用 --mjpeg 參數開啟）
+MJPEG_ENABLED = False
+# 監聽位址（預設只限本機）與埠號
+MJPEG_HOST = '127.0.0.1'
+MJPEG_PORT = 8080
+# JPEG 品質 (0 ~ 100)
+MJPEG_JPEG_QUALITY = 80
+
+# ==================== 手勢識別服務設置 ====================
+# 服務監聽位址（設定 SERVICE_UNIX_SOCKET 時改用 Unix socket）
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+SERVICE_UNIX_SOCKET = None
+
+# 微批次時間窗（毫秒）與單一批次最多手數
+SERVICE_BATCH_WINDOW_MS = 2.0
+SERVICE_MAX_BATCH = 4096
+
+# 待處理請求佇列上限（滿了會阻塞讀取端，形成背壓）
+SERVICE_QUEUE_SIZE = 10000
+
+# ==================== 效能分析設置 ====================
+# --profile 模式未指定 --max-frames 時處理的幀數
+PROFILE_FRAMES = 300
+# 分析結果輸出目錄（.prof、collapsed stacks 與文字報告）
+PROFILE_DIR = 'profiles'
+# 取樣式分析的取樣間隔（秒）
+PROFILE_SAMPLE_INTERVAL = 0.002
+# 報告中列出的熱點函式數量
+PROFILE_TOP_N = 15
+# 報告關注的模組
+PROFILE_MODULES = ('geometry', 'gesture_recognizer', 'visualizer', 'face_detector', 'main')
+# gesture_service.py / bench_frame_bus.py 的報告關注的模組
+PROFILE_SERVICE_MODULES = ('gesture_service', 'gesture_recognizer', 'geometry')
+PROFILE_FRAME_BUS_MODULES = ('bench_frame_bus', 'frame_bus')
+
 # ==================== 其他設置 ====================
 # 退出按鍵
 EXIT_KEY = 'q'
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+偵測後端模組
+- legacy：mp.solutions 的同步 Hands.process，影格迴圈等待偵測完成
+- live_stream：MediaPipe Tasks HandLandmarker / FaceDetector 的 LIVE_STREAM 模式，
+  送出影格後立即返回，結果由回呼寫入，下一次繪製時套用最新且未過期的結果
+
+兩種後端都提供 submit(img_rgb) / hold() / poll() / close() / get_statistics()，
+submit() 回傳影格是否實際送出（live_stream 上一幀還在偵測中時為 False）；
+poll() 在有新結果時回傳結果，沒有新結果時回傳 None（呼叫端沿用上一次的結果）；
+動態閘門略過一幀時呼叫 hold()，表示畫面沒變、目前的結果仍然有效
+"""
+
+import threading
+import time
+
+import mediapipe as mp
+
+from config import (
+    MAX_NUM_HANDS, MODEL_COMPLEXITY, MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE,
+    FACE_DETECTION_MIN_CONFIDENCE,
+    HAND_LANDMARKER_MODEL, FACE_DETECTOR_MODEL, DETECTION_RESULT_MAX_AGE_MS,
+)
+
+BACKEND_LEGACY = 'legacy'
+BACKEND_LIVE_STREAM = 'live_stream'
+BACKENDS = (BACKEND_LEGACY, BACKEND_LIVE_STREAM)
+
+
+def _now_ms():
+    return time.monotonic_ns() // 1_000_000
+
+
+class LegacyHandBackend:
+    """mp.solutions.hands 同步偵測"""
+
+    name = BACKEND_LEGACY
+
+    def __init__(self, max_hands=MAX_NUM_HANDS):
+        self.hands = mp.solutions.hands.Hands(
+            max_num_hands=max_hands,
+            model_complexity=MODEL_COMPLEXITY,
+            min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+        )
+        self._result = None
+        self.processed = 0
+
+    def submit(self, img_rgb):
+        """同步偵測，回傳時結果已可由 poll() 取得（一定會送出，回傳 True）"""
+        self._result = self.hands.process(img_rgb).multi_hand_landmarks or []
+        self.processed += 1
+        return True
+
+    def hold(self):
+        # 同步偵測的結果不會過期
+        pass
+
+    def poll(self):
+        result, self._result = self._result, None
+        return result
+
+    def close(self):
+        self.hands.close()
+
+    def get_statistics(self):
+        return {'backend': self.name, 'processed': self.processed, 'result_age_ms': 0}
+
+
+class _LiveStreamTask:
+    """
+    LIVE_STREAM 任務的共用部分：單調遞增的時間戳、同時只送出一幀、回呼結果與過期判斷
+
+    結果的年齡從它最後一次確認仍描述畫面的時間起算：送出的影格本身，
+    或之後動態閘門判定沒有變化（呼叫 hold()）的影格。畫面靜止時不會因為沒有送出新影格而過期。
+
+    子類別實作 _create(callback) 建立 Tasks 物件，以及 _parse(result, size) 轉換回呼結果。
+    """
+
+    name = BACKEND_LIVE_STREAM
+
+    def __init__(self, max_age_ms=DETECTION_RESULT_MAX_AGE_MS):
+        """
+        Args:
+            max_age_ms: 結果最多可沿用的時間（毫秒，從最後一次確認畫面沒變時起算）
+        """
+        self.max_age_ms = max_age_ms
+        self._lock = threading.Lock()
+        self._last_timestamp = -1
+        self._in_flight = None    # 尚未回呼的影格時間戳
+        self._latest = None       # (時間戳, 結果)
+        self._result_seq = 0
+        self._polled_seq = 0
+        self._valid_from = None   # 目前套用的結果最後一次確認有效的時間
+        self._size = None
+        self.expired = False      # 最近一次 poll() 是否因過期而清空結果
+        self.task = self._create(self._on_result)
+
+        # 統計資訊
+        self.submitted = 0
+        self.completed = 0
+        self.busy_skips = 0
+        self.stale_results = 0
+        self.result_age_ms = None
+        self._latency_total = 0
+
+    def _create(self, callback):
+        raise NotImplementedError
+
+    def _parse(self, result, size):
+        raise NotImplementedError
+
+    def _detect_async(self, image, timestamp_ms):
+        self.task.detect_async(image, timestamp_ms)
+
+    def submit(self, img_rgb):
+        """
+        送出一幀後立即返回；上一幀還在偵測中就略過（避免在 MediaPipe 內部排隊而讓結果越來越舊）
+
+        Returns:
+            bool: 是否實際送出
+        """
+        now = _now_ms()
+        with self._lock:
+            in_flight = self._in_flight
+        if in_flight is not None and now - in_flight <= self.max_age_ms:
+            self.busy_skips += 1
+            return False
+
+        # LIVE_STREAM 要求時間戳嚴格遞增
+        timestamp = max(now, self._last_timestamp + 1)
+        self._last_timestamp = timestamp
+        self._size = (img_rgb.shape[1], img_rgb.shape[0])
+        with self._lock:
+            self._in_flight = timestamp
+        # mp.Image 會複製資料，呼叫端可以立刻重複使用 img_rgb 緩衝區
+        self._detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=img_rgb), timestamp)
+        self.submitted += 1
+        return True
+
+    @property
+    def pending(self):
+        """是否有已送出但尚未回呼的影格"""
+        with self._lock:
+            return self._in_flight is not None
+
+    def hold(self):
+        """畫面與上一幀相同：目前套用的結果仍然有效，年齡從現在重新起算"""
+        if self._valid_from is not None:
+            self._valid_from = _now_ms()
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        """MediaPipe 工作執行緒的回呼：只保存結果，不做其他處理"""
+        parsed = self._parse(result, self._size)
+        with self._lock:
+            self._latest = (timestamp_ms, parsed)
+            self._result_seq += 1
+            if self._in_flight == timestamp_ms:
+                self._in_flight = None
+            self.completed += 1
+            self._latency_total += _now_ms() - timestamp_ms
+
+    def poll(self):
+        """
+        取得最新結果
+
+        Returns:
+            新結果；沒有新結果時為 None；最新結果已超過 max_age_ms 時回傳空列表（只回傳一次）
+        """
+        now = _now_ms()
+        with self._lock:
+            seq, latest = self._result_seq, self._latest
+        self.expired = False
+
+        if seq != self._polled_seq:
+            self._polled_seq = seq
+            timestamp, parsed = latest
+            if now - timestamp <= self.max_age_ms:
+                self._valid_from = timestamp
+                self.result_age_ms = now - timestamp
+                return parsed
+        elif self._valid_from is None:
+            return None
+        elif now - self._valid_from <= self.max_age_ms:
+            self.result_age_ms = now - self._valid_from
+            return None
+
+        # 目前套用的結果已過期：清空一次，之後等待新結果
+        self._valid_from = None
+        self.result_age_ms = None
+        self.stale_results += 1
+        self.expired = True
+        return []
+
+    def close(self):
+        self.task.close()
+
+    def get_statistics(self):
+        """獲取統計資訊"""
+        return {
+            'backend': self.name,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'busy_skips': self.busy_skips,
+            'stale_results': self.stale_results,
+            'result_age_ms': self.result_age_ms,
+            'mean_latency_ms': self._latency_total / self.completed if self.completed else 0.0,
+        }
+
+
+class LiveStreamHandBackend(_LiveStreamTask):
+    """MediaPipe Tasks HandLandmarker（LIVE_STREAM）"""
+
+    def __init__(self, model_path=HAND_LANDMARKER_MODEL, max_hands=MAX_NUM_HANDS, **kwargs):
+        self.model_path = model_path
+        self.max_hands = max_hands
+        super().__init__(**kwargs)
+
+    def _create(self, callback):
+        vision = mp.tasks.vision
+        options = vision.HandLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=self.model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=self.max_hands,
+            min_hand_detection_confidence=MIN_DETECTION_CONFIDENCE,
+            min_hand_presence_confidence=MIN_TRACKING_CONFIDENCE,
+            min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+            result_callback=callback,
+        )
+        return vision.HandLandmarker.create_from_options(options)
+
+    def _parse(self, result, size):
+        # 每隻手為 21 個 NormalizedLandmark 的列表
+        return result.hand_landmarks or []
+
+
+class LiveStreamFaceBackend(_LiveStreamTask):
+    """MediaPipe Tasks FaceDetector（LIVE_STREAM），結果轉成正規化的 (x, y, w, h)"""
+
+    def __init__(self, model_path=FACE_DETECTOR_MODEL, **kwargs):
+        self.model_path = model_path
+        super().__init__(**kwargs)
+
+    def _create(self, callback):
+        vision = mp.tasks.vision
+        options = vision.FaceDetectorOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=self.model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            min_detection_confidence=FACE_DETECTION_MIN_CONFIDENCE,
+            result_callback=callback,
+        )
+        return vision.FaceDetector.create_from_options(options)
+
+    def _parse(self, result, size):
+        # Tasks 回傳送入影像（可能是縮小版）的像素座標，換成正規化座標
+        w, h = size
+        boxes = []
+        for detection in result.detections or []:
+            box = detection.bounding_box
+            boxes.append((box.origin_x / w, box.origin_y / h, box.width / w, box.height / h))
+        return boxes
+
+
+def create_hand_backend(name):
+    """依名稱建立手部偵測後端"""
+    if name == BACKEND_LEGACY:
+        return LegacyHandBackend()
+    if name == BACKEND_LIVE_STREAM:
+        return LiveStreamHandBackend()
+    raise ValueError(f"未知的偵測後端: {name}（可用: {', '.join(BACKENDS)}）")
@@ -0,0 +1,263 @@
+"""
+違規影像證據模組
+以預先配置的環形緩衝區保存最近幾秒的原始影格，
+記錄違規時由背景執行緒把前後數秒（pre-roll + post-roll）編碼成影片檔；
+每個 slot 都帶有時間戳，前後秒數與輸出 FPS 依實際影格時間計算，不受迴圈速率影響
+"""
+
+import math
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from config import (
+    EVIDENCE_DIR, EVIDENCE_FPS, EVIDENCE_PRE_SECONDS, EVIDENCE_POST_SECONDS,
+    EVIDENCE_SLACK_FRAMES, EVIDENCE_JPEG_QUALITY, EVIDENCE_FOURCC,
+)
+
+
+class EvidenceRecorder:
+    """
+    固定記憶體的影格環形緩衝區 + 背景編碼執行緒
+
+    每個 slot 都有序號：寫入前設為 -1、寫完再設成影格序號，
+    編碼端讀取前後比對序號，被覆寫的影格直接略過並計入 lost_frames，不會鎖住影格迴圈。
+
+    影片寫完後 (路徑, 幀數) 會放進完成佇列，由影格迴圈以 poll_finished() 取回，
+    呼叫端只在實際寫入影格後才把路徑記到違規紀錄上。
+    """
+
+    def __init__(self, width, height, fps=EVIDENCE_FPS, pre_seconds=EVIDENCE_PRE_SECONDS,
+                 post_seconds=EVIDENCE_POST_SECONDS, output_dir=EVIDENCE_DIR,
+                 jpeg_quality=EVIDENCE_JPEG_QUALITY, slack_frames=EVIDENCE_SLACK_FRAMES):
+        """
+        Args:
+            width, height: 影格尺寸
+            fps: 預估的最高影格速率（只決定緩衝區長度；輸出 FPS 以實際時間戳計算）
+            pre_seconds: 違規前保留秒數
+            post_seconds: 違規後繼續錄製秒數
+            output_dir: 影片輸出資料夾
+            jpeg_quality: 設定時以 JPEG 壓縮保存影格（省記憶體，但每幀多一次編碼）
+            slack_frames: 額外的緩衝影格，讓背景編碼有時間追上
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.pre_frames = int(math.ceil(pre_seconds * fps))
+        self.post_frames = int(math.ceil(post_seconds * fps))
+        self.capacity = self.pre_frames + self.post_frames + slack_frames
+        self.output_dir = output_dir
+        self.jpeg_quality = jpeg_quality
+
+        if jpeg_quality:
+            self._frames = [None] * self.capacity
+            self._encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+        else:
+            self._frames = np.empty((self.capacity, height, width, 3), dtype=np.uint8)
+        self._seqs = np.full(self.capacity, -1, dtype=np.int64)
+        self._times = np.zeros(self.capacity, dtype=np.float64)  # time.monotonic() 秒
+        self._head = 0
+        self._new_frame = threading.Condition()
+
+        self._jobs = queue.Queue()
+        self._finished = queue.Queue()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._worker, name='evidence-encoder', daemon=True)
+        self._thread.start()
+
+        # 統計資訊
+        self.clips_written = 0
+        self.clips_failed = 0
+        self.lost_frames = 0
+        self.skipped_frames = 0
+
+    # ---------------------------------------------------------
+    # 影格迴圈端
+    # ---------------------------------------------------------
+    def push(self, frame):
+        """寫入一張原始影格（複製到預先配置的 slot，不配置新記憶體）"""
+        if frame.shape[0] != self.height or frame.shape[1] != self.width:
+            self.skipped_frames += 1
+            return
+
+        seq = self._head
+        slot = seq % self.capacity
+        self._seqs[slot] = -1
+        self._times[slot] = time.monotonic()
+        if self.jpeg_quality:
+            ok, buf = cv2.imencode('.jpg', frame, self._encode_params)
+            self._frames[slot] = buf if ok else None
+        else:
+            np.copyto(self._frames[slot], frame)
+        self._seqs[slot] = seq
+        self._head = seq + 1
+
+        with self._new_frame:
+            self._new_frame.notify_all()
+
+    def trigger(self, label):
+        """
+        排程一段違規影片（不阻塞）
+
+        Args:
+            label: 手勢名稱（用於檔名）
+
+        Returns:
+            str: 影片檔路徑（寫入完成後由 poll_finished() 回報，寫入失敗時不會存在）
+        """
+        safe_label = ''.join(c if c.isalnum() else '_' for c in label).strip('_') or 'gesture'
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        path = os.path.join(self.output_dir, f"violation_{stamp}_{safe_label}.mp4")
+        self._jobs.put((self._head, time.monotonic(), path))
+        return path
+
+    def poll_finished(self):
+        """
+        取回已處理完的影片（不阻塞）
+
+        Returns:
+            list: [(路徑, 寫入幀數), ...]；幀數為 0 代表寫入失敗，檔案已刪除
+        """
+        finished = []
+        while True:
+            try:
+                finished.append(self._finished.get_nowait())
+            except queue.Empty:
+                return finished
+
+    def close(self, timeout=5.0):
+        """停止背景執行緒（已排程的影片以現有影格收尾）"""
+        self._stopping = True
+        self._jobs.put(None)
+        with self._new_frame:
+            self._new_frame.notify_all()
+        self._thread.join(timeout=timeout)
+
+    # ---------------------------------------------------------
+    # 背景編碼端
+    # ---------------------------------------------------------
+    def _worker(self):
+        scratch = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            path = job[2]
+            try:
+                written = self._write_clip(*job, scratch)
+            except Exception as e:
+                print(f"違規影片寫入失敗: {e}")
+                written = 0
+            if not written:
+                self.clips_failed += 1
+                if os.path.exists(path):
+                    os.remove(path)
+            self._finished.put((path, written))
+
+    def _frame_time(self, seq):
+        """序號 seq 的影格時間戳，已被覆寫時回傳 None"""
+        slot = seq % self.capacity
+        if self._seqs[slot] != seq:
+            return None
+        t = self._times[slot]
+        return t if self._seqs[slot] == seq else None
+
+    def _wait_past(self, end_time):
+        """等到出現時間晚於 end_time 的影格（影格迴圈停住時最多多等 1 秒），回傳目前的 head"""
+        deadline = end_time + 1.0
+        with self._new_frame:
+            while not self._stopping and time.monotonic() < deadline:
+                head = self._head
+                if head and self._times[(head - 1) % self.capacity] > end_time:
+                    break
+                self._new_frame.wait(timeout=0.1)
+            return self._head
+
+    def _read(self, seq, scratch):
+        """讀取序號 seq 的影格，已被覆寫時回傳 None"""
+        slot = seq % self.capacity
+        if self._seqs[slot] != seq:
+            return None
+        if self.jpeg_quality:
+            buf = self._frames[slot]
+            if buf is None or self._seqs[slot] != seq:
+                return None
+            return cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        np.copyto(scratch, self._frames[slot])
+        if self._seqs[slot] != seq:
+            return None
+        return scratch
+
+    def _select_range(self, trigger_seq, trigger_time):
+        """依時間戳挑出 [trigger_time - pre, trigger_time + post] 內的影格序號範圍 [start, end)"""
+        # pre-roll：從觸發點往回找，直到超出 pre_seconds 或影格已被覆寫
+        start = trigger_seq
+        cutoff = trigger_time - self.pre_seconds
+        while start > 0 and trigger_seq - start < self.capacity:
+            t = self._frame_time(start - 1)
+            if t is None or t < cutoff:
+                break
+            start -= 1
+
+        # post-roll：等到 post_seconds 之後的影格出現，再去掉超出範圍的尾端
+        end_time = trigger_time + self.post_seconds
+        end = self._wait_past(end_time)
+        while end > trigger_seq:
+            t = self._frame_time(end - 1)
+            if t is not None and t <= end_time:
+                break
+            end -= 1
+        return start, end
+
+    def _measured_fps(self, start, end):
+        """以範圍內第一張與最後一張影格的時間差計算實際 FPS"""
+        first, last = self._frame_time(start), self._frame_time(end - 1)
+        if end - start < 2 or first is None or last is None or last <= first:
+            return float(self.fps)
+        return (end - start - 1) / (last - first)
+
+    def _write_clip(self, trigger_seq, trigger_time, path, scratch):
+        start, end = self._select_range(trigger_seq, trigger_time)
+        if end <= start:
+            print(f"違規影片沒有可用影格: {path}")
+            return 0
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*EVIDENCE_FOURCC),
+                                 self._measured_fps(start, end), (self.width, self.height))
+        if not writer.isOpened():
+            print(f"違規影片無法建立: {path}")
+            return 0
+        written = 0
+        try:
+            for seq in range(start, end):
+                frame = self._read(seq, scratch)
+                if frame is None:
+                    self.lost_frames += 1
+                    continue
+                writer.write(frame)
+                written += 1
+        finally:
+            writer.release()
+        if written:
+            self.clips_written += 1
+            print(f"違規影片已儲存: {path} ({written} 幀)")
+        return written
+
+    def get_statistics(self):
+        """獲取統計資訊"""
+        return {
+            'capacity': self.capacity,
+            'pending_clips': self._jobs.qsize(),
+            'clips_written': self.clips_written,
+            'clips_failed': self.clips_failed,
+            'lost_frames': self.lost_frames,
+            'skipped_frames': self.skipped_frames,
+        }
@@ -5,29 +5,62 @@
 
 import cv2
 import mediapipe as mp
+from detection_backends import BACKEND_LIVE_STREAM, LiveStreamFaceBackend
 from config import (
     FACE_DETECTION_MIN_CONFIDENCE,
-    FACE_DETECTION_MODEL_SELECTION
+    FACE_DETECTION_MODEL_SELECTION,
+    DETECTION_BACKEND
 )
 
 class FaceDetector:
     """處理臉部偵測的類 (使用 MediaPipe)"""
     
-    def __init__(self):
-        """初始化臉部偵測器"""
-        self.mp_face_detection = mp.solutions.face_detection
-        self.face_detection = self.mp_face_detection.FaceDetection(
-            min_detection_confidence=FACE_DETECTION_MIN_CONFIDENCE,
-            model_selection=FACE_DETECTION_MODEL_SELECTION
-        )
+    def __init__(self, backend=DETECTION_BACKEND):
+        """
+        初始化臉部偵測器
+
+        Args:
+            backend: 'legacy'（同步 mp.solutions）或 'live_stream'（非同步 Tasks FaceDetector）
+        """
+        self.live_stream = None
+        self.face_detection = None
+        if backend == BACKEND_LIVE_STREAM:
+            self.live_stream = LiveStreamFaceBackend()
+            self._last_boxes = []
+            self._needs_frame = True
+        else:
+            self.mp_face_detection = mp.solutions.face_detection
+            self.face_detection = self.mp_face_detection.FaceDetection(
+                min_detection_confidence=FACE_DETECTION_MIN_CONFIDENCE,
+                model_selection=FACE_DETECTION_MODEL_SELECTION
+            )
         self.valid = True
+        # 最近一次 detect() 的結果是否已對應到最新送出的畫面（live_stream 結果還在路上時為 False）
+        self.settled = True
+
+    @property
+    def needs_frame(self):
+        """下一次 detect() 是否需要 RGB 影像（live_stream 已送出、只等結果時不需要）"""
+        return self.live_stream is None or self._needs_frame
 
-    def detect(self, img):
+    def invalidate(self):
+        """畫面有變化：下一次 detect() 要送出新的影格"""
+        if self.live_stream is not None:
+            self._needs_frame = True
+
+    def hold(self):
+        """畫面沒有變化：目前的非同步結果仍然有效，不讓它過期（變化還沒送出時不延長）"""
+        if self.live_stream is not None and not self._needs_frame:
+            self.live_stream.hold()
+
+    def detect(self, img, img_rgb=None):
         """
         偵測影格中的臉部
         
         Args:
-            img: BGR 格式的影像陣列
+            img: BGR 格式的影像陣列（回傳的座標以此解析度為準）
+            img_rgb: 已轉好的 RGB 偵測用影像，可為縮小版本；None 時由 img 轉換
+                （live_stream 只在 needs_frame 時使用）
             
         Returns:
             list: 偵測到的臉部矩形列表 [(x, y, w, h), ...]
@@ -36,27 +69,50 @@ class FaceDetector:
             return []
             
         # MediaPipe 需要 RGB
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        results = self.face_detection.process(img_rgb)
-        
-        faces = []
-        if results.detections:
-            h, w, _ = img.shape
-            for detection in results.detections:
+        if img_rgb is None and self.needs_frame:
+            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+        if self.live_stream is not None:
+            # 非同步：畫面變化後送出一次（上一幀還在偵測中時下次再送），
+            # 之後每次只取回結果，沒有新結果就沿用上一次
+            if self._needs_frame and self.live_stream.submit(img_rgb):
+                self._needs_frame = False
+            # 先確認是否還在等待再取結果，避免回呼剛好發生在兩者之間而漏掉新結果
+            pending = self.live_stream.pending
+            boxes = self.live_stream.poll()
+            if boxes is not None:
+                self._last_boxes = boxes
+            boxes = self._last_boxes
+            self.settled = not (self._needs_frame or pending or self.live_stream.expired)
+        else:
+            results = self.face_detection.process(img_rgb)
+            boxes = []
+            for detection in results.detections or []:
                 bboxC = detection.location_data.relative_bounding_box
-                
-                # 轉換為像素座標
-                x = int(bboxC.xmin * w)
-                y = int(bboxC.ymin * h)
-                width = int(bboxC.width * w)
-                height = int(bboxC.height * h)
-                
-                # 邊界保護
-                x = max(0, x)
-                y = max(0, y)
-                width = min(w - x, width)
-                height = min(h - y, height)
-                
-                faces.append((x, y, width, height))
-        
+                boxes.append((bboxC.xmin, bboxC.ymin, bboxC.width, bboxC.height))
+
+        faces = []
+        h, w, _ = img.shape
+        for xmin, ymin, bw, bh in boxes:
+            # 正規化座標轉換為原圖像素座標
+            x = int(xmin * w)
+            y = int(ymin * h)
+            width = int(bw * w)
+            height = int(bh * h)
+
+            # 邊界保護
+            x = max(0, x)
+            y = max(0, y)
+            width = min(w - x, width)
+            height = min(h - y, height)
+
+            faces.append((x, y, width, height))
+
         return faces
+
+    def close(self):
+        """釋放偵測器"""
+        if self.live_stream is not None:
+            self.live_stream.close()
+        else:
+            self.face_detection.close()
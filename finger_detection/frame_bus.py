@@ -0,0 +1,208 @@
+"""
+共享記憶體影格匯流排模組
+以 multiprocessing.shared_memory 建立固定大小的影格環形緩衝區，
+讓擷取、偵測、繪製等階段可以分散在不同行程中交換影格而不需要 pickle / 複製
+
+記憶體配置（一塊共享記憶體）：
+    int64 header: [下一個發布序號, 各 slot 序號 * capacity, 各消費者已讀到的序號 * consumers]
+    影格區: capacity 個 (height, width, 3) uint8 影格
+"""
+
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import FRAME_WIDTH, FRAME_HEIGHT, FRAME_BUS_SLOTS, FRAME_BUS_POLL_INTERVAL
+
+_HEADER_ALIGN = 64
+_WRITING = -1
+
+
+def _attach_shared_memory(name):
+    """
+    附加到既有的共享記憶體。
+    Python 3.13+ 關閉追蹤，由建立者負責刪除；較舊版本的子行程與建立者共用
+    resource_tracker，重複登記不會造成誤刪。
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedFrameRing:
+    """
+    單一生產者、多消費者的共享記憶體影格環
+
+    - 生產者：claim() 取得 slot 的 view 直接寫入（例如 cap.read(image=view)），再 publish()
+    - 消費者：wait_for(seq) 等待影格，view(seq) 取得零複製的 view，處理完再用 is_valid(seq) 確認未被覆寫
+    - consumers > 0 時，生產者會等待最慢的消費者 ack()，保證不覆寫未讀影格；
+      consumers = 0 時為「最新影格優先」，覆寫不等待
+
+    每個 slot 的序號寫入前設為 -1、寫完才設為影格序號（seqlock），讀取端不需要加鎖。
+    """
+
+    def __init__(self, name=None, shape=(FRAME_HEIGHT, FRAME_WIDTH, 3), capacity=FRAME_BUS_SLOTS,
+                 consumers=0, create=True):
+        """
+        Args:
+            name: 共享記憶體名稱，create=False 時必填
+            shape: 單張影格形狀 (height, width, 3)
+            capacity: slot 數
+            consumers: 需要保證不遺漏影格的消費者數
+            create: True 建立新的共享記憶體，False 附加到既有的
+        """
+        self.shape = tuple(shape)
+        self.capacity = capacity
+        self.consumers = consumers
+        self.frame_bytes = int(np.prod(self.shape))
+
+        header_items = 1 + capacity + consumers
+        self._header_bytes = -(-header_items * 8 // _HEADER_ALIGN) * _HEADER_ALIGN
+        total = self._header_bytes + capacity * self.frame_bytes
+
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=total)
+        else:
+            self.shm = _attach_shared_memory(name)
+        self.owner = create
+
+        header = np.ndarray((header_items,), dtype=np.int64, buffer=self.shm.buf)
+        self._head = header[0:1]
+        self._slot_seqs = header[1:1 + capacity]
+        self._acks = header[1 + capacity:]
+        self.frames = np.ndarray((capacity,) + self.shape, dtype=np.uint8,
+                                 buffer=self.shm.buf, offset=self._header_bytes)
+        if create:
+            header[:] = 0
+            self._slot_seqs[:] = _WRITING
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        """傳給其他行程用來 attach 的參數"""
+        return {'name': self.name, 'shape': self.shape, 'capacity': self.capacity,
+                'consumers': self.consumers}
+
+    @classmethod
+    def attach(cls, name, shape, capacity, consumers=0):
+        return cls(name=name, shape=shape, capacity=capacity, consumers=consumers, create=False)
+
+    # ---------------------------------------------------------
+    # 生產者
+    # ---------------------------------------------------------
+    def claim(self, timeout=None):
+        """
+        取得下一個可寫入的 slot
+
+        Returns:
+            tuple: (seq, view)；等待消費者逾時回傳 (None, None)
+        """
+        seq = int(self._head[0])
+        if self.consumers:
+            deadline = None if timeout is None else time.perf_counter() + timeout
+            # 最慢的消費者還沒讀完 seq - capacity 之前，不能覆寫
+            while seq - int(self._acks.min()) >= self.capacity:
+                if deadline is not None and time.perf_counter() > deadline:
+                    return None, None
+                time.sleep(FRAME_BUS_POLL_INTERVAL)
+        slot = seq % self.capacity
+        self._slot_seqs[slot] = _WRITING
+        return seq, self.frames[slot]
+
+    def publish(self, seq):
+        """標記 claim() 取得的 slot 已寫入完成"""
+        self._slot_seqs[seq % self.capacity] = seq
+        self._head[0] = seq + 1
+
+    def write(self, frame, timeout=None):
+        """複製一張影格到下一個 slot 並發布，回傳序號（逾時為 None）"""
+        seq, view = self.claim(timeout)
+        if seq is None:
+            return None
+        np.copyto(view, frame)
+        self.publish(seq)
+        return seq
+
+    def close_stream(self):
+        """通知消費者不會再有新影格（head 設為負值；重複呼叫不會重新開啟串流）"""
+        if self._head[0] >= 0:
+            self._head[0] = -int(self._head[0]) - 1
+
+    # ---------------------------------------------------------
+    # 消費者
+    # ---------------------------------------------------------
+    def head(self):
+        """下一個將被發布的序號；串流結束時回傳 None"""
+        head = int(self._head[0])
+        return None if head < 0 else head
+
+    def _published(self):
+        head = int(self._head[0])
+        return -head - 1 if head < 0 else head
+
+    def wait_for(self, seq, timeout=None):
+        """
+        等待序號 seq 的影格發布
+
+        Returns:
+            bool: 影格可讀時為 True；逾時或串流已結束且沒有該影格時為 False
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            head = int(self._head[0])
+            if head < 0:
+                return seq < -head - 1
+            if seq < head:
+                return True
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+            time.sleep(FRAME_BUS_POLL_INTERVAL)
+
+    def latest(self):
+        """最新已發布的序號，尚無影格時為 None"""
+        published = self._published()
+        return published - 1 if published > 0 else None
+
+    def view(self, seq):
+        """取得序號 seq 的零複製 view，已被覆寫或尚未寫完時回傳 None"""
+        slot = seq % self.capacity
+        if self._slot_seqs[slot] != seq:
+            return None
+        return self.frames[slot]
+
+    def is_valid(self, seq):
+        """確認處理期間 seq 的 slot 沒有被覆寫"""
+        return self._slot_seqs[seq % self.capacity] == seq
+
+    def read(self, seq, out=None):
+        """複製序號 seq 的影格（out 可傳入預先配置的陣列），被覆寫時回傳 None"""
+        frame = self.view(seq)
+        if frame is None:
+            return None
+        if out is None:
+            out = frame.copy()
+        else:
+            np.copyto(out, frame)
+        return out if self.is_valid(seq) else None
+
+    def ack(self, consumer_index, seq):
+        """消費者回報 seq 之前的影格都處理完畢，允許生產者覆寫"""
+        self._acks[consumer_index] = seq + 1
+
+    # ---------------------------------------------------------
+    # 資源釋放
+    # ---------------------------------------------------------
+    def close(self):
+        """釋放本行程的對應；建立者同時刪除共享記憶體"""
+        # 先釋放所有 numpy view，否則 SharedMemory.close() 會因仍有參照而失敗
+        self._head = self._slot_seqs = self._acks = self.frames = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,274 @@
+"""
+影像來源模組
+統一攝影機、影片檔、圖片資料夾與合成影像的讀取介面，並提供背景預讀（prefetch）
+"""
+
+import os
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+from config import (
+    CAMERA_INDEX, FRAME_WIDTH, FRAME_HEIGHT,
+    CAMERA_FPS, CAMERA_FOURCC, FRAME_PREFETCH_SIZE,
+)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+
+class FrameSource:
+    """影像來源基底類別，介面與 cv2.VideoCapture 相同（isOpened / read / release）"""
+
+    def __init__(self, width=FRAME_WIDTH, height=FRAME_HEIGHT):
+        self.width = width
+        self.height = height
+        self.resized_frames = 0  # 需要額外 resize 的影格數（理想為 0）
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        """
+        讀取下一幀
+
+        Returns:
+            tuple: (ret, frame)，沒有更多影格時 ret 為 False
+        """
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def describe(self):
+        return self.__class__.__name__
+
+    def _fit(self, frame):
+        """來源解析度與目標不符時才 resize"""
+        if frame.shape[1] != self.width or frame.shape[0] != self.height:
+            self.resized_frames += 1
+            frame = cv2.resize(frame, (self.width, self.height))
+        return frame
+
+
+class CameraSource(FrameSource):
+    """攝影機來源：直接向裝置協商解析度、FPS 與像素格式，避免逐幀 resize"""
+
+    def __init__(self, index=CAMERA_INDEX, width=FRAME_WIDTH, height=FRAME_HEIGHT,
+                 fps=CAMERA_FPS, fourcc=CAMERA_FOURCC):
+        super().__init__(width, height)
+        self.index = index
+        self.cap = cv2.VideoCapture(index)
+        if self.cap.isOpened():
+            # 先設定像素格式，部分驅動程式要在 MJPG 下才提供高解析度/高 FPS
+            if fourcc:
+                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            if fps:
+                self.cap.set(cv2.CAP_PROP_FPS, fps)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret:
+            return False, None
+        return True, self._fit(frame)
+
+    def release(self):
+        self.cap.release()
+
+    def describe(self):
+        actual_w = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        actual_h = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        actual_fps = self.cap.get(cv2.CAP_PROP_FPS)
+        return f"攝影機 {self.index} ({actual_w} x {actual_h} @ {actual_fps:.0f} fps)"
+
+
+class VideoFileSource(FrameSource):
+    """影片檔來源"""
+
+    def __init__(self, path, width=FRAME_WIDTH, height=FRAME_HEIGHT, loop=False):
+        super().__init__(width, height)
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            return False, None
+        return True, self._fit(frame)
+
+    def release(self):
+        self.cap.release()
+
+    def describe(self):
+        return f"影片檔 {self.path}"
+
+
+class ImageDirectorySource(FrameSource):
+    """圖片資料夾來源，依檔名排序逐張讀取"""
+
+    def __init__(self, directory, width=FRAME_WIDTH, height=FRAME_HEIGHT, loop=False):
+        super().__init__(width, height)
+        self.directory = directory
+        self.loop = loop
+        if os.path.isdir(directory):
+            self.files = sorted(
+                os.path.join(directory, name) for name in os.listdir(directory)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        else:
+            self.files = []
+        self.position = 0
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def read(self):
+        while True:
+            if self.position >= len(self.files):
+                if not self.loop or not self.files:
+                    return False, None
+                self.position = 0
+            path = self.files[self.position]
+            self.position += 1
+            frame = cv2.imread(path)
+            if frame is not None:
+                return True, self._fit(frame)
+
+    def describe(self):
+        return f"圖片資料夾 {self.directory} ({len(self.files)} 張)"
+
+
+class SyntheticSource(FrameSource):
+    """合成影像來源：移動的色塊，不需要攝影機即可做端到端吞吐量測試"""
+
+    def __init__(self, count=None, width=FRAME_WIDTH, height=FRAME_HEIGHT):
+        """
+        Args:
+            count: 產生的影格數，None 代表無限
+        """
+        super().__init__(width, height)
+        self.count = count
+        self.position = 0
+        gradient = np.linspace(0, 255, width, dtype=np.uint8)
+        self.background = np.dstack([np.tile(gradient, (height, 1))] * 3)
+
+    def read(self):
+        if self.count is not None and self.position >= self.count:
+            return False, None
+        frame = self.background.copy()
+        size = min(self.width, self.height) // 4
+        x = (self.position * 7) % max(1, self.width - size)
+        y = (self.position * 5) % max(1, self.height - size)
+        cv2.rectangle(frame, (x, y), (x + size, y + size), (0, 128, 255), -1)
+        self.position += 1
+        return True, frame
+
+    def describe(self):
+        total = '無限' if self.count is None else self.count
+        return f"合成影像 ({self.width} x {self.height}, {total} 幀)"
+
+
+class PrefetchSource(FrameSource):
+    """
+    背景預讀包裝：另一個執行緒持續讀取，放入有上限的緩衝區
+
+    drop_oldest=True 時（即時來源），緩衝區滿了會丟掉最舊的影格，避免延遲累積；
+    否則（檔案來源）讀取端會等待，不遺漏任何影格。
+    """
+
+    _END = object()
+
+    def __init__(self, source, buffer_size=FRAME_PREFETCH_SIZE, drop_oldest=False):
+        super().__init__(source.width, source.height)
+        self.source = source
+        self.drop_oldest = drop_oldest
+        self.dropped_frames = 0
+        self._buffer = queue.Queue(maxsize=max(1, buffer_size))
+        self._stopped = threading.Event()
+        self._finished = False
+        self._thread = threading.Thread(target=self._reader, name='frame-prefetch', daemon=True)
+        if source.isOpened():
+            self._thread.start()
+
+    def _reader(self):
+        while not self._stopped.is_set():
+            ret, frame = self.source.read()
+            item = frame if ret else self._END
+            while not self._stopped.is_set():
+                try:
+                    if self.drop_oldest:
+                        self._buffer.put_nowait(item)
+                    else:
+                        self._buffer.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    if self.drop_oldest:
+                        try:
+                            self._buffer.get_nowait()
+                            self.dropped_frames += 1
+                        except queue.Empty:
+                            pass
+            if not ret:
+                break
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def read(self):
+        if self._finished:
+            return False, None
+        item = self._buffer.get()
+        if item is self._END:
+            self._finished = True
+            return False, None
+        return True, item
+
+    def release(self):
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        self.source.release()
+
+    def describe(self):
+        return f"{self.source.describe()} [預讀 {self._buffer.maxsize} 幀]"
+
+
+def open_source(spec='camera', prefetch=FRAME_PREFETCH_SIZE, width=FRAME_WIDTH, height=FRAME_HEIGHT):
+    """
+    依字串建立影像來源
+
+    Args:
+        spec: 'camera'、'camera:1'、'video:path.mp4'、'images:dir'、'synthetic' 或 'synthetic:300'
+        prefetch: 預讀緩衝區大小，0 代表不預讀
+
+    Returns:
+        FrameSource
+    """
+    kind, _, arg = spec.partition(':')
+    if kind == 'camera':
+        source = CameraSource(int(arg) if arg else CAMERA_INDEX, width, height)
+    elif kind == 'video':
+        source = VideoFileSource(arg, width, height)
+    elif kind == 'images':
+        source = ImageDirectorySource(arg, width, height)
+    elif kind == 'synthetic':
+        source = SyntheticSource(int(arg) if arg else None, width, height)
+    else:
+        raise ValueError(f"未知的影像來源: {spec}")
+
+    if prefetch:
+        source = PrefetchSource(source, prefetch, drop_oldest=(kind == 'camera'))
+    return source
@@ -5,6 +5,8 @@
 
 import math
 
+import numpy as np
+
 def vector_2d_angle(v1, v2):
     """
     根據兩點的座標，計算角度
@@ -40,46 +42,47 @@ def calculate_hand_angles(landmarks):
     根據傳入的 21 個手部節點座標，計算五根手指的角度
     
     Args:
-        landmarks: 包含 21 個手部關鍵點的座標列表 [(x, y), ...]
+        landmarks: HandDetection、(21, 2) 座標陣列或座標列表 [(x, y), ...]
     
     Returns:
         list: 五根手指的角度列表 [大拇指, 食指, 中指, 無名指, 小拇指]
     """
-    angle_list = []
-    
-    # 大拇指角度 (Node 0-2 vs 3-4)
-    angle_ = vector_2d_angle(
-        ((int(landmarks[0][0]) - int(landmarks[2][0])), (int(landmarks[0][1]) - int(landmarks[2][1]))),
-        ((int(landmarks[3][0]) - int(landmarks[4][0])), (int(landmarks[3][1]) - int(landmarks[4][1])))
-    )
-    angle_list.append(angle_)
-    
-    # 食指角度 (Node 0-6 vs 7-8)
-    angle_ = vector_2d_angle(
-        ((int(landmarks[0][0]) - int(landmarks[6][0])), (int(landmarks[0][1]) - int(landmarks[6][1]))),
-        ((int(landmarks[7][0]) - int(landmarks[8][0])), (int(landmarks[7][1]) - int(landmarks[8][1])))
-    )
-    angle_list.append(angle_)
-    
-    # 中指角度 (Node 0-10 vs 11-12)
-    angle_ = vector_2d_angle(
-        ((int(landmarks[0][0]) - int(landmarks[10][0])), (int(landmarks[0][1]) - int(landmarks[10][1]))),
-        ((int(landmarks[11][0]) - int(landmarks[12][0])), (int(landmarks[11][1]) - int(landmarks[12][1])))
-    )
-    angle_list.append(angle_)
-    
-    # 無名指角度 (Node 0-14 vs 15-16)
-    angle_ = vector_2d_angle(
-        ((int(landmarks[0][0]) - int(landmarks[14][0])), (int(landmarks[0][1]) - int(landmarks[14][1]))),
-        ((int(landmarks[15][0]) - int(landmarks[16][0])), (int(landmarks[15][1]) - int(landmarks[16][1])))
-    )
-    angle_list.append(angle_)
-    
-    # 小拇指角度 (Node 0-18 vs 19-20)
-    angle_ = vector_2d_angle(
-        ((int(landmarks[0][0]) - int(landmarks[18][0])), (int(landmarks[0][1]) - int(landmarks[18][1]))),
-        ((int(landmarks[19][0]) - int(landmarks[20][0])), (int(landmarks[19][1]) - int(landmarks[20][1])))
-    )
-    angle_list.append(angle_)
-    
-    return angle_list
+    points = np.asarray(getattr(landmarks, 'points', landmarks))
+    return calculate_hand_angles_batch(points[np.newaxis])[0].tolist()
+
+
+# 五根手指計算角度時使用的節點 (根部向量: 0 -> base，指尖向量: joint -> tip)
+_FINGER_BASE = np.array([2, 6, 10, 14, 18])
+_FINGER_JOINT = np.array([3, 7, 11, 15, 19])
+_FINGER_TIP = np.array([4, 8, 12, 16, 20])
+
+
+def calculate_hand_angles_batch(points):
+    """
+    向量化版本的 calculate_hand_angles，一次計算多隻手的五指角度
+
+    與逐點版本的行為一致：座標先取整數，向量長度為 0 或
+    餘弦值超出 [-1, 1] 時角度視為 180。
+
+    Args:
+        points: 形狀為 (N, 21, 2) 的關鍵點座標陣列
+
+    Returns:
+        np.ndarray: 形狀為 (N, 5) 的角度陣列（度數）
+    """
+    pts = np.asarray(points)
+    if not np.issubdtype(pts.dtype, np.integer):
+        pts = np.trunc(pts)
+    pts = pts.astype(np.float64, copy=False)
+
+    v1 = pts[:, :1, :] - pts[:, _FINGER_BASE, :]
+    v2 = pts[:, _FINGER_JOINT, :] - pts[:, _FINGER_TIP, :]
+
+    dot = np.einsum('nfk,nfk->nf', v1, v2)
+    norm = np.sqrt(np.einsum('nfk,nfk->nf', v1, v1)) * np.sqrt(np.einsum('nfk,nfk->nf', v2, v2))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cos = dot / norm
+    valid = (norm > 0) & (np.abs(cos) <= 1.0)
+
+    return np.where(valid, np.degrees(np.arccos(np.where(valid, cos, 1.0))), 180.0)
@@ -3,8 +3,13 @@
 負責根據手指角度與關鍵點座標判斷手勢類型
 """
 
+import numpy as np
+
 from config import FINGER_BEND_THRESHOLD, THUMB_DIRECTION_THRESHOLD_RATIO
-from geometry import calculate_hand_angles
+from geometry import calculate_hand_angles_batch
+
+# 批次識別回傳的手勢代碼對照表（代碼 = 索引，0 代表未識別）
+GESTURE_LABELS = ('', 'GangSign', 'thumb_mid_pinky', 'bad!!!', 'good', 'no!!!', 'ROCK!', 'fist', 'ok')
 
 class GestureRecognizer:
     def __init__(self):
@@ -15,92 +20,74 @@ class GestureRecognizer:
         識別手勢
         
         Args:
-            landmarks: 21 個手部關鍵點座標列表 [(x, y), ...]
+            landmarks: HandDetection、(21, 2) 座標陣列或座標列表 [(x, y), ...]
             
         Returns:
             str: 手勢名稱
         """
-        if not landmarks:
+        points = np.asarray(getattr(landmarks, 'points', landmarks))
+        if len(points) == 0:
             return ''
-            
-        # 計算手指角度
-        angles = calculate_hand_angles(landmarks)
-        
-        f1, f2, f3, f4, f5 = angles
-        threshold = self.threshold
-
-        # 計算手部 bounding box 高度（用於正規化方向判斷）
-        ys = [p[1] for p in landmarks]
-        box_h = max(ys) - min(ys) if ys else 0
-
-        # ---------------------------------------------------------
-        # 1. 優先檢測特殊手勢 (Gang Sign)
-        # ---------------------------------------------------------
-        # Westside / Gang Sign 識別邏輯
-        # 特徵：食指小指伸直 + (中指無名指交叉 OR 中指無名指緊貼)
-        if f2 < threshold and f5 < threshold:
-            # 取得關鍵點座標
-            idx_tip = landmarks[8]   # 食指尖
-            mid_tip = landmarks[12]  # 中指尖
-            rng_tip = landmarks[16]  # 無名指尖
-            mid_mcp = landmarks[9]   # 中指根
-            rng_mcp = landmarks[13]  # 無名指根
-
-            # 寬鬆檢查：中指與無名指只要「指尖高於指根」即可
-            if mid_tip[1] < mid_mcp[1] and rng_tip[1] < rng_mcp[1]:
-                # 判斷 A: 嚴格交叉檢測
-                is_crossed = (mid_tip[0] - rng_tip[0]) * (mid_mcp[0] - rng_mcp[0]) < 0
-
-                # 判斷 B: 視覺聚攏檢測
-                dist_mid_rng = abs(mid_tip[0] - rng_tip[0])
-                dist_idx_mid = abs(idx_tip[0] - mid_tip[0])
-                is_touching = dist_mid_rng < (dist_idx_mid * 0.35)
-
-                if is_crossed or is_touching:
-                    return 'GangSign'
-
-        # ---------------------------------------------------------
-        # 2. 檢測其他手勢
-        # ---------------------------------------------------------
-        
-        # 特殊不雅手勢：大拇指+中指+小指伸直，食指+無名指捲縮
-        if f1<threshold and f2>=threshold and f3<threshold and f4>=threshold and f5<threshold:
-            return 'thumb_mid_pinky'
-
-        # 讚 / 倒讚：大拇指伸直且其他手指捲縮
-        if f1<threshold and f2>=threshold and f3>=threshold and f4>=threshold and f5>=threshold:
-            if len(landmarks) > 4:
-                thumb_mcp = landmarks[2]
-                thumb_tip = landmarks[4]
-                dy = thumb_tip[1] - thumb_mcp[1]
-                threshold_dy = (box_h * THUMB_DIRECTION_THRESHOLD_RATIO) if box_h > 0 else 10
-                
-                if dy > threshold_dy:
-                    return 'bad!!!'   # 倒讚
-                elif dy < -threshold_dy:
-                    return 'good'     # 讚
-                else:
-                    return 'good'     # 保守判定
-            return 'good'
-
-        # 中指 (no!!!)
-        if f1>=threshold and f2>=threshold and f3<threshold and f4>=threshold and f5>=threshold:
-            return 'no!!!'
-
-        # 搖滾 (ROCK!)
-        if f1<threshold and f2<threshold and f3>=threshold and f4>=threshold and f5<threshold:
-            return 'ROCK!'
-
-        # 拳頭 (fist)
-        if f1>=threshold and f2>=threshold and f3>=threshold and f4>=threshold and f5>=threshold:
-            return 'fist'
-
-        # OK
-        if f1>=threshold and f2>=threshold and f3<threshold and f4<threshold and f5<threshold:
-            return 'ok'
-        
-        # OK (另一種變體)
-        if f1<threshold and f2>=threshold and f3<threshold and f4<threshold and f5<threshold:
-            return 'ok'
+        return GESTURE_LABELS[self.classify_batch(points[np.newaxis])[0]]
+
+    def classify_batch(self, points):
+        """
+        向量化批次識別手勢
+
+        Args:
+            points: 形狀為 (N, 21, 2) 的關鍵點座標陣列
+
+        Returns:
+            np.ndarray: 長度 N 的手勢代碼陣列（對應 GESTURE_LABELS 的索引）
+        """
+        pts = np.asarray(points, dtype=np.float64)
+        if len(pts) == 0:
+            return np.zeros(0, dtype=np.uint8)
+
+        angles = calculate_hand_angles_batch(points)
+        straight = angles < self.threshold
+        bent = ~straight
+        s1, s2, s3, s4, s5 = straight.T
+        b1, b2, b3, b4, b5 = bent.T
+
+        x = pts[:, :, 0]
+        y = pts[:, :, 1]
+
+        # 1. Gang Sign：食指小指伸直 + 中指無名指指尖高於指根 + (交叉 OR 緊貼)
+        # 判斷 A: 嚴格交叉；判斷 B: 中指無名指距離小於食指中指距離的 0.35 倍
+        is_crossed = (x[:, 12] - x[:, 16]) * (x[:, 9] - x[:, 13]) < 0
+        is_touching = np.abs(x[:, 12] - x[:, 16]) < np.abs(x[:, 8] - x[:, 12]) * 0.35
+        gang = s2 & s5 & (y[:, 12] < y[:, 9]) & (y[:, 16] < y[:, 13]) & (is_crossed | is_touching)
+
+        # 2. 讚 / 倒讚：依大拇指方向與手部高度判斷
+        thumb = s1 & b2 & b3 & b4 & b5
+        box_h = y.max(axis=1) - y.min(axis=1)
+        threshold_dy = np.where(box_h > 0, box_h * THUMB_DIRECTION_THRESHOLD_RATIO, 10)
+        thumb_down = (y[:, 4] - y[:, 2]) > threshold_dy
+
+        # 依優先順序排列，第一個成立的條件決定手勢
+        conditions = [
+            gang,
+            s1 & b2 & s3 & b4 & s5,   # thumb_mid_pinky
+            thumb & thumb_down,       # bad!!!
+            thumb,                    # good
+            b1 & b2 & s3 & b4 & b5,   # no!!!
+            s1 & s2 & b3 & b4 & s5,   # ROCK!
+            b1 & b2 & b3 & b4 & b5,   # fist
+            b1 & b2 & s3 & s4 & s5,   # ok
+            s1 & b2 & s3 & s4 & s5,   # ok (另一種變體)
+        ]
+        codes = [1, 2, 3, 4, 5, 6, 7, 8, 8]
+        return np.select(conditions, codes, default=0).astype(np.uint8)
 
-        return ''
+    def recognize_batch(self, points):
+        """
+        批次識別手勢
+
+        Args:
+            points: 形狀為 (N, 21, 2) 的關鍵點座標陣列
+
+        Returns:
+            list: 每隻手的手勢名稱
+        """
+        return [GESTURE_LABELS[c] for c in self.classify_batch(points)]
@@ -0,0 +1,477 @@
+"""
+手勢識別服務模組
+以本機 TCP 或 Unix socket 提供集中式手勢識別，
+將多個客戶端送來的關鍵點在短時間窗內合併成微批次，再用向量化識別器一次處理。
+
+傳輸格式（little-endian）：
+- 請求：header (request_id: uint32, op: uint8, n_hands: uint16) + n_hands * 21 * 2 個 int32 座標
+- 回應：header (request_id: uint32, op: uint8, length: uint32) + payload
+  - OP_CLASSIFY：每隻手一個 uint8 手勢代碼（對應 GESTURE_LABELS）
+  - OP_STATS：UTF-8 JSON 格式的服務統計
+"""
+
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+
+from gesture_recognizer import GestureRecognizer, GESTURE_LABELS
+from profiler import ProfileSession
+from config import (
+    SERVICE_HOST, SERVICE_PORT, SERVICE_UNIX_SOCKET,
+    SERVICE_BATCH_WINDOW_MS, SERVICE_MAX_BATCH, SERVICE_QUEUE_SIZE,
+    PROFILE_DIR, PROFILE_SERVICE_MODULES,
+)
+
+REQUEST_HEADER = struct.Struct('<IBH')
+RESPONSE_HEADER = struct.Struct('<IBI')
+
+OP_CLASSIFY = 0
+OP_STATS = 1
+
+HAND_BYTES = 21 * 2 * 4
+MAX_HANDS_PER_REQUEST = 0xFFFF
+
+
+def _recv_exact(sock, size):
+    """從 socket 讀取剛好 size 個位元組，連線關閉時回傳 None"""
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            return None
+        received += n
+    return buf
+
+
+class _Connection:
+    """包裝單一客戶端連線，讓批次執行緒與讀取執行緒能安全地寫回應"""
+
+    __slots__ = ('sock', 'lock', 'closed')
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def send(self, request_id, op, payload):
+        if self.closed:
+            return
+        data = RESPONSE_HEADER.pack(request_id, op, len(payload)) + payload
+        try:
+            with self.lock:
+                self.sock.sendall(data)
+        except OSError:
+            self.closed = True
+
+
+class _PendingRequest:
+    __slots__ = ('conn', 'request_id', 'points')
+
+    def __init__(self, conn, request_id, points):
+        self.conn = conn
+        self.request_id = request_id
+        self.points = points
+
+
+class _ServiceHandler(socketserver.BaseRequestHandler):
+    """每個連線一個讀取執行緒：解析請求並放入批次佇列"""
+
+    def handle(self):
+        service = self.server.service
+        sock = self.request
+        conn = _Connection(sock)
+        try:
+            while True:
+                header = _recv_exact(sock, REQUEST_HEADER.size)
+                if header is None:
+                    break
+                request_id, op, n_hands = REQUEST_HEADER.unpack(header)
+
+                if op == OP_CLASSIFY:
+                    body = _recv_exact(sock, n_hands * HAND_BYTES)
+                    if body is None:
+                        break
+                    points = np.frombuffer(body, dtype='<i4').reshape(n_hands, 21, 2)
+                    service.submit(conn, request_id, points)
+                elif op == OP_STATS:
+                    payload = json.dumps(service.get_statistics()).encode('utf-8')
+                    conn.send(request_id, OP_STATS, payload)
+                else:
+                    break
+        except OSError:
+            pass
+        finally:
+            conn.closed = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    _UnixServer = None
+
+
+class GestureService:
+    """微批次手勢識別服務"""
+
+    def __init__(self, host=SERVICE_HOST, port=SERVICE_PORT, unix_socket=SERVICE_UNIX_SOCKET,
+                 batch_window_ms=SERVICE_BATCH_WINDOW_MS, max_batch=SERVICE_MAX_BATCH,
+                 queue_size=SERVICE_QUEUE_SIZE):
+        """
+        初始化服務
+
+        Args:
+            host, port: TCP 監聽位址（port 為 0 時由系統分配）
+            unix_socket: Unix socket 路徑，設定後忽略 host/port
+            batch_window_ms: 微批次時間窗（毫秒）
+            max_batch: 單一批次最多處理的手數
+            queue_size: 待處理請求佇列上限
+        """
+        self.recognizer = GestureRecognizer()
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max_batch
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._server = None
+        self._threads = []
+        self._running = False
+
+        # 統計資訊
+        self.batch_count = 0
+        self.request_count = 0
+        self.hand_count = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+
+    @property
+    def address(self):
+        """實際監聽位址：Unix socket 路徑或 (host, port)"""
+        if self._server is None:
+            return self.unix_socket or (self.host, self.port)
+        return self._server.server_address
+
+    def start(self):
+        """啟動監聽與批次執行緒"""
+        if self.unix_socket:
+            if _UnixServer is None:
+                raise RuntimeError("此平台不支援 Unix socket")
+            if os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)
+            self._server = _UnixServer(self.unix_socket, _ServiceHandler)
+        else:
+            self._server = _TCPServer((self.host, self.port), _ServiceHandler)
+        self._server.service = self
+
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name='gesture-service-accept', daemon=True),
+            threading.Thread(target=self._batch_loop, name='gesture-service-batch', daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self):
+        """停止服務並釋放 socket"""
+        self._running = False
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout=1.0)
+        self._threads = []
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
+
+    def submit(self, conn, request_id, points):
+        """把請求放入批次佇列（佇列滿時阻塞，讓 socket 形成背壓）"""
+        self._queue.put(_PendingRequest(conn, request_id, points))
+
+    def _batch_loop(self):
+        """收集時間窗內的請求，合併後一次識別，再拆開回傳"""
+        while self._running:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            hands = len(first.points)
+            deadline = time.perf_counter() + self.batch_window
+            while hands < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._running = False
+                    break
+                batch.append(item)
+                hands += len(item.points)
+
+            self._process_batch(batch, hands)
+
+    def _process_batch(self, batch, hands):
+        if len(batch) == 1:
+            points = batch[0].points
+        else:
+            points = np.concatenate([req.points for req in batch])
+        codes = self.recognizer.classify_batch(points)
+
+        offset = 0
+        for req in batch:
+            n = len(req.points)
+            req.conn.send(req.request_id, OP_CLASSIFY, codes[offset:offset + n].tobytes())
+            offset += n
+
+        self.batch_count += 1
+        self.request_count += len(batch)
+        self.hand_count += hands
+        self.last_batch_size = hands
+        self.max_batch_size = max(self.max_batch_size, hands)
+
+    def get_statistics(self):
+        """獲取服務統計資訊（佇列深度與批次大小）"""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'batches': self.batch_count,
+            'requests': self.request_count,
+            'hands': self.hand_count,
+            'last_batch_size': self.last_batch_size,
+            'max_batch_size': self.max_batch_size,
+            'avg_batch_size': (self.hand_count / self.batch_count) if self.batch_count else 0.0,
+        }
+
+
+class GestureServiceClient:
+    """手勢識別服務客戶端，支援同步呼叫與管線化（pipelined）請求"""
+
+    def __init__(self, address):
+        """
+        Args:
+            address: Unix socket 路徑（str）或 (host, port)
+        """
+        if isinstance(address, str):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.connect(address)
+        self._next_id = 0
+
+    def send_classify(self, points):
+        """
+        送出識別請求但不等待結果
+
+        Args:
+            points: 形狀為 (N, 21, 2) 的關鍵點座標陣列
+
+        Returns:
+            int: request_id
+        """
+        pts = np.ascontiguousarray(points, dtype='<i4').reshape(-1, 21, 2)
+        if len(pts) > MAX_HANDS_PER_REQUEST:
+            raise ValueError(f"單一請求最多 {MAX_HANDS_PER_REQUEST} 隻手")
+        request_id = self._next_id
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        self.sock.sendall(REQUEST_HEADER.pack(request_id, OP_CLASSIFY, len(pts)) + pts.tobytes())
+        return request_id
+
+    def recv_result(self):
+        """
+        讀取一筆回應
+
+        Returns:
+            tuple: (request_id, op, payload)
+        """
+        header = _recv_exact(self.sock, RESPONSE_HEADER.size)
+        if header is None:
+            raise ConnectionError("服務已關閉連線")
+        request_id, op, length = RESPONSE_HEADER.unpack(header)
+        payload = _recv_exact(self.sock, length) if length else bytearray()
+        if payload is None:
+            raise ConnectionError("服務已關閉連線")
+        return request_id, op, payload
+
+    def classify(self, points):
+        """同步識別一批手勢，回傳手勢名稱列表"""
+        self.send_classify(points)
+        _, _, payload = self.recv_result()
+        return [GESTURE_LABELS[c] for c in payload]
+
+    def get_statistics(self):
+        """取得服務端統計資訊"""
+        self.sock.sendall(REQUEST_HEADER.pack(0, OP_STATS, 0))
+        _, _, payload = self.recv_result()
+        return json.loads(payload.decode('utf-8'))
+
+    def close(self):
+        self.sock.close()
+
+
+def _random_hands(rng, n):
+    """產生隨機手部關鍵點作為壓力測試輸入"""
+    base = rng.integers(100, 620, size=(n, 1, 2))
+    return (base + rng.integers(-80, 80, size=(n, 21, 2))).astype(np.int32)
+
+
+def run_load_test(address, clients=4, requests=2000, hands_per_request=8, pipeline=16, seed=0,
+                  check_every=16, payload_variants=8):
+    """
+    本機壓力測試：多個客戶端同時以管線化方式送出請求
+
+    Args:
+        address: 服務位址
+        clients: 並行客戶端數
+        requests: 每個客戶端送出的請求數
+        hands_per_request: 每個請求包含的手數
+        pipeline: 每個客戶端同時在途的請求數上限
+        check_every: 每隔幾筆回應抽查一次結果是否正確（第一筆一定檢查）
+        payload_variants: 每個客戶端輪流送出的不同關鍵點組數，回應錯置時抽查才比對得出來
+
+    Returns:
+        dict: 吞吐量、延遲與正確性統計
+    """
+    latencies = []
+    checks = [0, 0]  # [抽查筆數, 不符筆數]
+    lock = threading.Lock()
+    recognizer = GestureRecognizer()
+
+    def worker(idx):
+        rng = np.random.default_rng(seed + idx)
+        payloads = [_random_hands(rng, hands_per_request) for _ in range(payload_variants)]
+        expected = [recognizer.recognize_batch(payload) for payload in payloads]
+        client = GestureServiceClient(address)
+        sent_at = {}  # request_id -> (送出時間, 關鍵點組索引)
+        local = []
+        checked = mismatched = 0
+        sent = received = 0
+        try:
+            while received < requests:
+                while sent < requests and sent - received < pipeline:
+                    variant = sent % payload_variants
+                    request_id = client.send_classify(payloads[variant])
+                    sent_at[request_id] = (time.perf_counter(), variant)
+                    sent += 1
+                request_id, _, codes = client.recv_result()
+                sent_time, variant = sent_at.pop(request_id)
+                local.append(time.perf_counter() - sent_time)
+                # 在整個測試期間抽查，負載下的錯置或損毀批次才會被發現
+                if received % check_every == 0:
+                    checked += 1
+                    if [GESTURE_LABELS[c] for c in codes] != expected[variant]:
+                        mismatched += 1
+                received += 1
+        finally:
+            client.close()
+        with lock:
+            latencies.extend(local)
+            checks[0] += checked
+            checks[1] += mismatched
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total_hands = clients * requests * hands_per_request
+    return {
+        'elapsed_s': elapsed,
+        'hands_per_s': total_hands / elapsed if elapsed > 0 else 0.0,
+        'requests_per_s': clients * requests / elapsed if elapsed > 0 else 0.0,
+        'latency_p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        'latency_p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        'checked_responses': checks[0],
+        'mismatched_responses': checks[1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='手勢識別微批次服務')
+    parser.add_argument('mode', choices=('serve', 'bench'), help='serve: 啟動服務；bench: 本機壓力測試')
+    parser.add_argument('--host', default=SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    parser.add_argument('--unix', default=SERVICE_UNIX_SOCKET, help='Unix socket 路徑')
+    parser.add_argument('--window-ms', type=float, default=SERVICE_BATCH_WINDOW_MS)
+    parser.add_argument('--max-batch', type=int, default=SERVICE_MAX_BATCH)
+    parser.add_argument('--connect', action='store_true', help='bench 模式下連線到既有服務，而非啟動內建服務')
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--hands', type=int, default=8)
+    parser.add_argument('--pipeline', type=int, default=16)
+    parser.add_argument('--profile', action='store_true',
+                        help=f'效能分析模式：取樣所有執行緒（含批次執行緒）並輸出熱點報告到 {PROFILE_DIR}/')
+    args = parser.parse_args()
+
+    service = None
+    if args.mode == 'serve' or not args.connect:
+        port = args.port if args.mode == 'serve' else 0
+        service = GestureService(host=args.host, port=port, unix_socket=args.unix,
+                                 batch_window_ms=args.window_ms, max_batch=args.max_batch).start()
+        print(f"手勢識別服務已啟動: {service.address}")
+
+    try:
+        if args.profile:
+            # 識別在服務的批次執行緒中進行，取樣所有執行緒才看得到
+            with ProfileSession(f'gesture_service-{args.mode}', modules=PROFILE_SERVICE_MODULES,
+                                all_threads=True, unit='請求') as session:
+                session.frames = _run(args, service)
+        else:
+            _run(args, service)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if service:
+            service.stop()
+
+
+def _run(args, service):
+    """執行 serve（直到 Ctrl+C）或 bench，回傳處理的請求數"""
+    if args.mode == 'serve':
+        try:
+            while True:
+                time.sleep(5)
+                stats = service.get_statistics()
+                print(f"佇列深度: {stats['queue_depth']}  "
+                      f"平均批次: {stats['avg_batch_size']:.1f}  "
+                      f"累計手數: {stats['hands']}")
+        except KeyboardInterrupt:
+            pass
+        return service.request_count
+
+    address = service.address if service else (args.unix or (args.host, args.port))
+    result = run_load_test(address, clients=args.clients, requests=args.requests,
+                           hands_per_request=args.hands, pipeline=args.pipeline)
+    print(json.dumps(result, indent=2))
+    if service:
+        print(json.dumps(service.get_statistics(), indent=2))
+    return args.clients * args.requests
+
+
+if __name__ == "__main__":
+    main()
@@ -5,24 +5,35 @@
 
 import json
 import os
+import time
 from datetime import datetime, date
 
+from action_bus import ActionEvent, console_log_handler, EVENT_VIOLATION, EVENT_FACE_MOSAIC
+
 
 class GestureTracker:
     """追蹤不雅手勢次數的後台管理類"""
     
-    def __init__(self, data_file='gesture_log.json'):
+    def __init__(self, data_file='gesture_log.json', bus=None, history_seconds=0):
         """
         初始化追蹤器
         
         Args:
             data_file: 儲存手勢記錄的 JSON 檔案路徑
+            bus: ActionBus，設定後警告訊息改為發布事件，記錄檔也改由背景執行緒寫入
+            history_seconds: 違規時間戳保留秒數（不受每日重置影響，供滑動時間窗使用）
         """
         self.data_file = data_file
+        self.bus = bus
+        self.history_seconds = history_seconds
+        self.violation_history = []  # 最近 history_seconds 秒內的違規時間（epoch 秒）
         self.bad_gesture_count = 0
         self.face_mosaic_enabled = False
+        self.violations = []  # 今日違規紀錄 [{'time', 'gesture', 'clip'}, ...]
         self.threshold = 5  # 觸發臉部馬賽克的閾值
         self.today = str(date.today())
+        self._save_seq = 0   # 已要求寫入的次數
+        self._saved_seq = 0  # 背景執行緒已寫入的最新一次
         self.load_data()
     
     def load_data(self):
@@ -31,11 +42,19 @@ class GestureTracker:
             try:
                 with open(self.data_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    
+
+                # 違規時間戳跨日保留（舊格式的檔案則由違規紀錄補上）
+                history = data.get('violation_history')
+                if history is None:
+                    history = self._parse_times(data.get('violations', []))
+                self.violation_history = sorted(float(t) for t in history)
+                self._prune_history()
+
                 # 檢查是否為今天的記錄
                 if data.get('date') == self.today:
                     self.bad_gesture_count = data.get('bad_gesture_count', 0)
                     self.face_mosaic_enabled = data.get('face_mosaic_enabled', False)
+                    self.violations = data.get('violations', [])
                     print(f"載入今日記錄: {self.bad_gesture_count} 次不雅手勢")
                 else:
                     # 新的一天，重置計數器
@@ -48,56 +67,138 @@ class GestureTracker:
             print("首次使用，建立新記錄檔案")
             self._reset_daily_data()
     
+    @staticmethod
+    def _parse_times(records):
+        """違規紀錄的 ISO 時間轉成 epoch 秒，無法解析的紀錄略過"""
+        times = []
+        for record in records:
+            try:
+                times.append(datetime.fromisoformat(record['time']).timestamp())
+            except (KeyError, TypeError, ValueError):
+                continue
+        return times
+
+    def _prune_history(self, now=None):
+        """移除超過保留時間的違規時間戳"""
+        cutoff = (time.time() if now is None else now) - self.history_seconds
+        history = self.violation_history
+        drop = 0
+        while drop < len(history) and history[drop] < cutoff:
+            drop += 1
+        if drop:
+            del history[:drop]
+
     def _reset_daily_data(self):
         """重置每日數據"""
         self.bad_gesture_count = 0
         self.face_mosaic_enabled = False
+        self.violations = []
         self.save_data()
     
-    def save_data(self):
-        """儲存手勢記錄到檔案"""
-        data = {
+    def _snapshot(self):
+        """目前的記錄內容（列表另外複製，背景寫檔時呼叫端可繼續修改）"""
+        return {
             'date': self.today,
             'bad_gesture_count': self.bad_gesture_count,
             'face_mosaic_enabled': self.face_mosaic_enabled,
+            'violations': list(self.violations),
+            'violation_history': list(self.violation_history),
             'last_update': datetime.now().isoformat()
         }
-        
+
+    def _write_data(self, data, seq=None):
         try:
             with open(self.data_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
         except IOError as e:
             print(f"儲存記錄失敗: {e}")
+        if seq is not None:
+            self._saved_seq = seq
+
+    def save_data(self):
+        """儲存手勢記錄到檔案（有事件匯流排時交給背景執行緒，影格迴圈不等待寫檔）"""
+        data = self._snapshot()
+        if self.bus is None:
+            self._write_data(data)
+            return
+        # 佇列滿而被丟棄時，下一次儲存或 flush() 會寫入完整的最新狀態
+        self._save_seq += 1
+        self.bus.defer(self._write_data, data, self._save_seq)
+
+    def flush(self):
+        """事件匯流排停止後呼叫：最新狀態還沒寫入（例如曾被丟棄）就同步寫入"""
+        if self._saved_seq != self._save_seq:
+            self._write_data(self._snapshot(), self._save_seq)
     
-    def add_bad_gesture(self, gesture_name):
+    def check_new_day(self):
+        """跨過午夜時重置每日計數（長時間執行的程式也會正確換日）"""
+        today = str(date.today())
+        if today != self.today:
+            self.today = today
+            print("新的一天開始，重置計數器")
+            self._reset_daily_data()
+            return True
+        return False
+    
+    def add_bad_gesture(self, gesture_name, clip=None):
         """
         記錄一次不雅手勢
         
         Args:
             gesture_name: 手勢名稱
+            clip: 對應的違規影片路徑（可為 None）
             
         Returns:
             bool: 是否觸發了臉部馬賽克
         """
+        self.check_new_day()
+        now = datetime.now()
         self.bad_gesture_count += 1
-        print(f"[警告] 偵測到不雅手勢: {gesture_name} (今日第 {self.bad_gesture_count} 次)")
+        if self.history_seconds:
+            self.violation_history.append(round(now.timestamp(), 3))
+            self._prune_history(now.timestamp())
+        self.violations.append({
+            'time': now.isoformat(),
+            'gesture': gesture_name,
+            'clip': clip,
+        })
+        self._notify(EVENT_VIOLATION, gesture=gesture_name, count=self.bad_gesture_count, clip=clip)
         
         # 檢查是否達到閾值
         if self.bad_gesture_count >= self.threshold and not self.face_mosaic_enabled:
             self.face_mosaic_enabled = True
-            print(f"\n{'='*60}")
-            print(f"!!! 警告：不雅手勢次數已達 {self.threshold} 次！啟動臉部馬賽克功能 !!!")
-            print(f"{'='*60}\n")
+            self._notify(EVENT_FACE_MOSAIC, threshold=self.threshold)
         
         self.save_data()
         return self.face_mosaic_enabled
     
+    def attach_clip(self, record, clip):
+        """
+        在違規影片寫入完成後補上路徑
+
+        Args:
+            record: add_bad_gesture() 加入 violations 的紀錄
+            clip: 影片路徑
+        """
+        record['clip'] = clip
+        # 換日後舊紀錄已不在今日列表中，就不必再寫檔
+        if any(r is record for r in self.violations):
+            self.save_data()
+
+    def _notify(self, kind, **data):
+        """有事件匯流排時發布事件，否則直接輸出到主控台"""
+        if self.bus is not None:
+            self.bus.publish(kind, **data)
+        else:
+            console_log_handler(ActionEvent(kind, data))
+    
     def is_face_mosaic_enabled(self):
         """檢查是否啟用臉部馬賽克"""
         return self.face_mosaic_enabled
     
     def get_statistics(self):
         """獲取統計資訊"""
+        self.check_new_day()
         return {
             'date': self.today,
             'bad_gesture_count': self.bad_gesture_count,
@@ -105,7 +206,15 @@ class GestureTracker:
             'remaining_warnings': max(0, self.threshold - self.bad_gesture_count)
         }
     
-    def reset(self):
-        """手動重置（僅供測試或管理員使用）"""
+    def reset(self, clear_history=True):
+        """
+        手動重置今日計數（僅供測試或管理員使用）
+
+        Args:
+            clear_history: 是否一併清空跨日保留的違規時間戳；
+                False 時滑動時間窗在重新啟動後仍然有效
+        """
         print("手動重置計數器")
+        if clear_history:
+            self.violation_history = []
         self._reset_daily_data()
@@ -0,0 +1,83 @@
+"""
+手部偵測資料模組
+以預先配置的 NumPy 陣列保存每隻手的 21 個像素座標，避免影格迴圈中逐點轉換與重複配置
+"""
+
+import numpy as np
+
+from config import MAX_NUM_HANDS
+
+NUM_LANDMARKS = 21
+
+
+class HandDetection:
+    """單一手部偵測結果，points 為 (21, 2) int32 像素座標"""
+
+    __slots__ = ('points', 'text', 'code', 'slot', 'track_id')
+
+    def __init__(self, points):
+        """
+        Args:
+            points: 形狀為 (21, 2) 的 int32 陣列（通常是 HandDetectionPool 緩衝區的 view）
+        """
+        self.points = points
+        self.text = ''
+        self.code = 0  # 手勢代碼（GESTURE_LABELS 的索引）
+        self.slot = -1  # HandTrackManager 的狀態陣列索引
+        self.track_id = -1  # 跨幀穩定的追蹤 ID
+
+
+class HandDetectionPool:
+    """預先配置的 HandDetection 池，每一幀重複使用同一塊記憶體"""
+
+    def __init__(self, max_hands=MAX_NUM_HANDS):
+        """
+        Args:
+            max_hands: 每幀最多保存的手數
+        """
+        self.max_hands = max_hands
+        self.points = np.zeros((max_hands, NUM_LANDMARKS, 2), dtype=np.int32)
+        self.hands = [HandDetection(self.points[i]) for i in range(max_hands)]
+        # 正規化座標暫存區，以 memoryview 逐點寫入（不產生中間陣列），再一次換算所有手
+        self._normalized = np.empty((max_hands, NUM_LANDMARKS, 2), dtype=np.float64)
+        self._normalized_flat = memoryview(self._normalized.reshape(-1))
+        self._scale = np.empty(2, dtype=np.float64)
+
+    def extract(self, multi_hand_landmarks, w, h):
+        """
+        將 MediaPipe 正規化關鍵點轉成像素座標，寫入預先配置的緩衝區
+
+        Args:
+            multi_hand_landmarks: MediaPipe 的 multi_hand_landmarks（legacy），
+                或 Tasks HandLandmarkerResult.hand_landmarks（每隻手為關鍵點列表）
+            w, h: 影像寬高
+
+        Returns:
+            list: 本幀的 HandDetection 列表（物件會在下一次呼叫時被覆寫）
+        """
+        if not multi_hand_landmarks:
+            return []
+
+        self._scale[0] = w
+        self._scale[1] = h
+        n = min(len(multi_hand_landmarks), self.max_hands)
+        flat = self._normalized_flat
+        for i in range(n):
+            hand_landmarks = multi_hand_landmarks[i]
+            # legacy 為 NormalizedLandmarkList，Tasks 為 NormalizedLandmark 列表
+            landmarks = getattr(hand_landmarks, 'landmark', hand_landmarks)
+            k = i * NUM_LANDMARKS * 2
+            for lm in landmarks:
+                flat[k] = lm.x
+                flat[k + 1] = lm.y
+                k += 2
+
+            hand = self.hands[i]
+            hand.text = ''
+            hand.code = 0
+
+        # 所有手一次換算成像素座標；與 int() 相同，直接截斷小數
+        normalized = self._normalized[:n]
+        np.multiply(normalized, self._scale, out=normalized)
+        np.copyto(self.points[:n], normalized, casting='unsafe')
+        return self.hands[:n]
@@ -0,0 +1,163 @@
+"""
+手部追蹤模組
+在連續影格間配對手部偵測結果，給每隻手穩定的追蹤 ID，
+並以固定大小的陣列保存每個追蹤的平滑框與 debounce 狀態，避免多隻手之間互相干擾
+"""
+
+import numpy as np
+
+from config import MAX_NUM_HANDS, TRACK_MAX_DISTANCE_RATIO, TRACK_MAX_MISSED_FRAMES
+
+
+class HandTrackManager:
+    """以最近中心點貪婪配對的輕量手部追蹤器，狀態以 slot 索引存放在陣列中"""
+
+    def __init__(self, max_tracks=MAX_NUM_HANDS, max_distance_ratio=TRACK_MAX_DISTANCE_RATIO,
+                 max_missed=TRACK_MAX_MISSED_FRAMES):
+        """
+        Args:
+            max_tracks: 同時追蹤的手數上限（slot 數）
+            max_distance_ratio: 配對允許的最大中心距離（相對於影像對角線）
+            max_missed: 連續幾幀未出現就釋放該追蹤
+        """
+        self.max_tracks = max_tracks
+        self.max_distance_ratio = max_distance_ratio
+        self.max_missed = max_missed
+        self._next_id = 0
+
+        # 追蹤狀態
+        self.active = np.zeros(max_tracks, dtype=bool)
+        self.track_ids = np.full(max_tracks, -1, dtype=np.int64)
+        self.centers = np.zeros((max_tracks, 2), dtype=np.float32)
+        self.missed = np.zeros(max_tracks, dtype=np.int32)
+        self.seen = np.zeros(max_tracks, dtype=bool)
+
+        # 馬賽克框平滑狀態 (x_min, y_min, x_max, y_max)
+        self.bboxes = np.zeros((max_tracks, 4), dtype=np.int32)
+        self.bbox_valid = np.zeros(max_tracks, dtype=bool)
+
+        # debounce 狀態
+        self.gesture_codes = np.zeros(max_tracks, dtype=np.uint8)
+        self.gesture_counts = np.zeros(max_tracks, dtype=np.int32)
+        self.logged = np.zeros(max_tracks, dtype=bool)
+
+    def _reset_slot(self, slot):
+        self.bbox_valid[slot] = False
+        self.gesture_codes[slot] = 0
+        self.gesture_counts[slot] = 0
+        self.logged[slot] = False
+        self.missed[slot] = 0
+
+    def update(self, detections, points, w, h):
+        """
+        將本幀的偵測結果配對到既有追蹤，並設定 hand.slot / hand.track_id
+
+        Args:
+            detections: 本幀的 HandDetection 列表
+            points: 對應的 (N, 21, 2) 座標陣列
+            w, h: 影像寬高
+        """
+        self.seen[:] = False
+        n = len(detections)
+        if n:
+            centers = points[:n].mean(axis=1, dtype=np.float32)
+            max_distance = self.max_distance_ratio * float(np.hypot(w, h))
+
+            # 距離矩陣 (偵測 x slot)，未啟用的 slot 視為無限遠
+            dist = np.linalg.norm(centers[:, None, :] - self.centers[None, :, :], axis=2)
+            dist[:, ~self.active] = np.inf
+
+            assigned = [-1] * n
+            for _ in range(min(n, self.max_tracks)):
+                i, slot = np.unravel_index(np.argmin(dist), dist.shape)
+                if dist[i, slot] > max_distance:
+                    break
+                assigned[i] = slot
+                dist[i, :] = np.inf
+                dist[:, slot] = np.inf
+
+            # 未配對的偵測開新追蹤
+            for i in range(n):
+                if assigned[i] >= 0:
+                    continue
+                free = np.flatnonzero(~self.active)
+                if len(free):
+                    slot = int(free[0])
+                else:
+                    # slot 用完時，讓出本幀沒配對到、消失最久的追蹤
+                    taken = set(assigned)
+                    stale = [s for s in range(self.max_tracks) if s not in taken]
+                    if not stale:
+                        continue
+                    slot = max(stale, key=lambda s: self.missed[s])
+                self._reset_slot(slot)
+                self.active[slot] = True
+                self.track_ids[slot] = self._next_id
+                self._next_id += 1
+                assigned[i] = slot
+
+            for i, hand in enumerate(detections):
+                slot = int(assigned[i])
+                hand.slot = slot
+                if slot < 0:
+                    hand.track_id = -1
+                    continue
+                hand.track_id = int(self.track_ids[slot])
+                self.centers[slot] = centers[i]
+                self.missed[slot] = 0
+                self.seen[slot] = True
+
+        # 本幀沒出現的追蹤：停止馬賽克框平滑，但保留 debounce 與已記錄狀態，
+        # 避免偵測短暫中斷後同一個手勢被重複記錄；太久沒出現才釋放並清空
+        lost = self.active & ~self.seen
+        if lost.any():
+            self.missed[lost] += 1
+            self.bbox_valid[lost] = False
+            expired = lost & (self.missed > self.max_missed)
+            if expired.any():
+                self.active[expired] = False
+                self.track_ids[expired] = -1
+                self.gesture_codes[expired] = 0
+                self.gesture_counts[expired] = 0
+                self.logged[expired] = False
+
+    def debounce(self, slot, code):
+        """
+        更新單一追蹤的 debounce 狀態
+
+        Args:
+            slot: 追蹤 slot
+            code: 黑名單手勢代碼，非黑名單時為 0
+
+        Returns:
+            int: 此手勢連續出現的幀數
+        """
+        if code == 0:
+            self.gesture_codes[slot] = 0
+            self.gesture_counts[slot] = 0
+            self.logged[slot] = False
+            return 0
+        if self.gesture_codes[slot] == code:
+            self.gesture_counts[slot] += 1
+        else:
+            # 換另一種手勢 → 重置 buffer
+            self.gesture_codes[slot] = code
+            self.gesture_counts[slot] = 1
+            self.logged[slot] = False
+        return int(self.gesture_counts[slot])
+
+    def prev_bbox(self, slot):
+        """取得該追蹤上一幀的馬賽克框，沒有時回傳 None"""
+        if slot < 0 or not self.bbox_valid[slot]:
+            return None
+        return self.bboxes[slot].tolist()
+
+    def set_bbox(self, slot, bbox):
+        """記錄該追蹤本幀的馬賽克框，bbox 為 None 時清除"""
+        if slot < 0:
+            return
+        if bbox is None:
+            self.bbox_valid[slot] = False
+        else:
+            self.bboxes[slot] = bbox
+            self.bbox_valid[slot] = True
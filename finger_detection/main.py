@@ -4,74 +4,98 @@
 並對不雅手勢進行多段懲罰（警告音、高風險提示、Shut Down 全黑畫面）與馬賽克處理。
 """
 
+import argparse
+import time
+
 import cv2
 import numpy as np
-import mediapipe as mp
 
 from gesture_tracker import GestureTracker
-from gesture_recognizer import GestureRecognizer
+from gesture_recognizer import GestureRecognizer, GESTURE_LABELS
+from hand_detection import HandDetectionPool
+from hand_tracks import HandTrackManager
+from evidence_recorder import EvidenceRecorder
+from penalty_engine import PenaltyEngine
+from motion_gate import MotionGate
 from visualizer import Visualizer
 from face_detector import FaceDetector
+from frame_source import open_source
+from detection_backends import BACKENDS, create_hand_backend
+from mjpeg_server import MjpegServer
+from profiler import ProfileSession
+from action_bus import (
+    ActionBus, FileNotifier, CommandHook, console_log_handler, warning_beep_handler,
+    ALL_EVENTS, EVENT_PENALTY_CHANGED,
+)
 from config import (
-    CAMERA_INDEX, FRAME_WIDTH, FRAME_HEIGHT,
-    MODEL_COMPLEXITY, MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE,
+    FRAME_WIDTH, FRAME_HEIGHT, INFERENCE_WIDTH, INFERENCE_HEIGHT,
+    MAX_NUM_HANDS,
     BLACKLIST_GESTURES, DEBOUNCE_FRAMES,
     BAD_GESTURE_THRESHOLD, GESTURE_LOG_FILE,
-    EXIT_KEY, WINDOW_NAME,
+    EXIT_KEY, WINDOW_NAME, DRAW_SKELETON, SKELETON_TOGGLE_KEY,
+    ACTION_EVENT_LOG_FILE, ACTION_WEBHOOK_URL, ACTION_COMMAND, EVIDENCE_ENABLED,
+    MOTION_GATE_ENABLED, PROFILE_FRAMES, PROFILE_DIR, DETECTION_BACKEND,
+    MJPEG_ENABLED, MJPEG_PORT, PENALTY_WINDOWS,
 )
 
 
 class EnhancedGestureTracker(GestureTracker):
     """
     只在本檔案內使用的「加強版追蹤器」：
-    - 不修改原本 gesture_tracker.GestureTracker 檔案
-    - 內部依照 bad_gesture_count 推出 penalty_level（normal / high_warning / shutdown）
+    - 繼承 gesture_tracker.GestureTracker（每日計數、違規紀錄、事件通知），在其上加入懲罰等級
+    - 內部以 PenaltyEngine 的滑動時間窗推出 penalty_level（normal / high_warning / shutdown）
+    - penalty_level 改變時發布 EVENT_PENALTY_CHANGED 事件（需設定 bus）
+    - 臉部馬賽克跟著 penalty_level：high_warning 以上開啟，違規過期降回 normal 時關閉
     - add_bad_gesture() 回傳 dict：{"level_changed": bool, "penalty_level": str, "face_mosaic_enabled": bool}
-    - get_statistics() 會在原本 stats 的基礎上加上 "penalty_level"
+    - get_statistics() 會在原本 stats 的基礎上加上 "penalty_level" 與各時間窗次數 "window_counts"
     """
 
     def __init__(self, *args, **kwargs):
+        # 違規時間戳至少保留最長的時間窗，重新啟動或跨日後仍能正確計算
+        kwargs.setdefault('history_seconds', max(PENALTY_WINDOWS.values()))
         super().__init__(*args, **kwargs)
-        # 初始懲罰等級
-        self.penalty_level = "normal"
+        # 滑動時間窗懲罰引擎，以保留的違規時間初始化（不受每日重置影響）
+        self.penalty_engine = PenaltyEngine()
+        self.penalty_engine.seed(self.violation_history)
+        # 初始懲罰等級（啟動時不發布事件）
+        self.penalty_level = self.penalty_engine.level()
+        self.face_mosaic_enabled = self.penalty_level != 'normal'
 
     def _update_penalty_level(self):
         """
-        根據當前 bad_gesture_count 計算懲罰等級。
-        - normal: 未達 BAD_GESTURE_THRESHOLD
-        - high_warning: >= BAD_GESTURE_THRESHOLD
-        - shutdown: >= BAD_GESTURE_THRESHOLD * 2  （可依需要再調整）
+        依 PENALTY_TIERS 在各滑動時間窗中的違規次數計算懲罰等級。
+        預設：24 小時內 >= BAD_GESTURE_THRESHOLD 為 high_warning、>= 兩倍為 shutdown，
+        10 分鐘內連續 3 次也會進入 high_warning；時間窗過期後等級會自動下降。
         """
-        count = self.bad_gesture_count
-
-        if count >= BAD_GESTURE_THRESHOLD * 2:
-            new_level = "shutdown"
-        elif count >= BAD_GESTURE_THRESHOLD:
-            new_level = "high_warning"
-        else:
-            new_level = "normal"
+        new_level = self.penalty_engine.level()
 
-        level_changed = new_level != self.penalty_level
+        previous_level = self.penalty_level
+        level_changed = new_level != previous_level
         self.penalty_level = new_level
+        # 臉部馬賽克跟著懲罰等級（10 分鐘內多次違規也會觸發，過期後自動關閉）
+        self.face_mosaic_enabled = new_level != 'normal'
+        if level_changed:
+            self._notify(EVENT_PENALTY_CHANGED, penalty_level=new_level, previous_level=previous_level)
         return level_changed, new_level
 
-    def add_bad_gesture(self, gesture_name):
+    def add_bad_gesture(self, gesture_name, clip=None):
         """
         包一層在原本 GestureTracker.add_bad_gesture 外面：
-        - 先呼叫原本的 add_bad_gesture（維持原本計數 & 臉部馬賽克邏輯）
-        - 再根據最新的 bad_gesture_count 算出 penalty_level
+        - 先呼叫原本的 add_bad_gesture（維持原本的每日計數與違規紀錄）
+        - 再由懲罰引擎算出 penalty_level（臉部馬賽克跟著等級）
         - 回傳 dict，讓主程式可以使用 result['penalty_level']
         """
-        # 呼叫原本的邏輯（會更新 bad_gesture_count / face_mosaic_enabled）
-        face_mosaic_now = super().add_bad_gesture(gesture_name)
+        # 呼叫原本的邏輯（會更新 bad_gesture_count 與 violations）
+        super().add_bad_gesture(gesture_name, clip=clip)
+        self.penalty_engine.record()
 
-        # 重新計算懲罰等級
+        # 重新計算懲罰等級（同時更新 face_mosaic_enabled）
         level_changed, new_level = self._update_penalty_level()
 
         return {
             "level_changed": level_changed,
             "penalty_level": new_level,
-            "face_mosaic_enabled": face_mosaic_now,
+            "face_mosaic_enabled": self.face_mosaic_enabled,
         }
 
     def get_statistics(self):
@@ -80,37 +104,75 @@ class EnhancedGestureTracker(GestureTracker):
         讓程式可以直接用 stats["penalty_level"] 判斷是否進入 shutdown。
         """
         stats = super().get_statistics()
+        # 每幀重新評估，讓過期的違規自動降級
+        self._update_penalty_level()
+        stats["face_mosaic_enabled"] = self.face_mosaic_enabled
         stats["penalty_level"] = self.penalty_level
+        stats["window_counts"] = self.penalty_engine.counts()
         return stats
 
+    def reset(self, clear_history=True):
+        """手動重置；清空違規時間戳時一併清空懲罰引擎"""
+        super().reset(clear_history)
+        if clear_history:
+            self.penalty_engine.reset()
+        self._update_penalty_level()
+
 
 class GestureRecognitionApp:
-    def __init__(self):
-        """初始化應用程式"""
+    def __init__(self, source=None, display=True, backend=DETECTION_BACKEND,
+                 mjpeg_port=MJPEG_PORT if MJPEG_ENABLED else None):
+        """
+        初始化應用程式
+
+        Args:
+            source: FrameSource 影像來源，None 時使用預設攝影機
+            display: 是否以 cv2.imshow 顯示畫面（無螢幕環境可關閉）
+            backend: 偵測後端，'legacy'（同步）或 'live_stream'（MediaPipe Tasks 非同步回呼）
+            mjpeg_port: 開啟本機 MJPEG 串流的埠號，None 代表不開啟
+        """
         # 1. 初始化各個模組（使用加強版追蹤器，原檔案不變）
-        self.tracker = EnhancedGestureTracker(data_file=GESTURE_LOG_FILE)
+        # 副作用（嗶聲、訊息、hook）全部經由事件匯流排在背景執行
+        self.bus = self._create_action_bus()
+        self.tracker = EnhancedGestureTracker(data_file=GESTURE_LOG_FILE, bus=self.bus)
         # 仍沿用原本閾值設定，確保臉部馬賽克門檻一致
         self.tracker.threshold = BAD_GESTURE_THRESHOLD
 
         self.recognizer = GestureRecognizer()
+        self.hand_pool = HandDetectionPool(MAX_NUM_HANDS)
         self.visualizer = Visualizer()
-        self.face_detector = FaceDetector()
+        self.face_detector = FaceDetector(backend)
+
+        # 2. 初始化 MediaPipe 手部偵測後端
+        self.hand_backend = create_hand_backend(backend)
+
+        # 偵測用縮小影像的緩衝區（顯示與馬賽克仍使用原解析度）
+        self.inference_size = (INFERENCE_WIDTH, INFERENCE_HEIGHT)
+        self._inference_bgr = None
+        self._inference_rgb = None
+
+        # 3. 初始化影像來源（預設為攝影機）
+        self.source = source if source is not None else open_source('camera')
+        self.display = display
 
-        # 2. 初始化 MediaPipe
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            model_complexity=MODEL_COMPLEXITY,
-            min_detection_confidence=MIN_DETECTION_CONFIDENCE,
-            min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
-        )
+        # 違規影片證據（固定記憶體環形緩衝區，背景編碼）
+        self.evidence = EvidenceRecorder(FRAME_WIDTH, FRAME_HEIGHT) if EVIDENCE_ENABLED else None
+        self._pending_clips = {}  # 影片路徑 -> 等待補上路徑的違規紀錄
 
-        # 3. 初始化攝影機
-        self.cap = cv2.VideoCapture(CAMERA_INDEX)
+        # 4. 多手追蹤（每隻手各自的 debounce 與馬賽克平滑狀態）
+        self.hand_tracks = HandTrackManager(MAX_NUM_HANDS)
+        self._blacklist_codes = np.array([label in BLACKLIST_GESTURES for label in GESTURE_LABELS])
 
-        # 4. 狀態變數（debounce 用）
-        self.gesture_buffer_text = ""
-        self.gesture_buffer_count = 0
-        self.current_gesture_logged = False
+        # 動態閘門：畫面靜止時沿用上一次偵測到的手與臉
+        self.motion_gate = MotionGate() if MOTION_GATE_ENABLED else None
+        self._last_detections = []
+        self._cached_faces = None
+
+        # 已打碼畫面的 MJPEG 串流（編碼與分送都在背景執行緒）
+        self.stream = MjpegServer(port=mjpeg_port).start() if mjpeg_port is not None else None
+
+        # 是否繪製手部骨架（執行中可按鍵切換）
+        self.draw_skeleton = DRAW_SKELETON
 
         # 5. 是否進入 Shut Down 模式（全黑畫面）
         self.shutdown_mode = False
@@ -125,19 +187,46 @@ class GestureRecognitionApp:
         stats = self.tracker.get_statistics()
         print("=" * 50)
         print("手勢識別系統啟動中...")
-        print(f"攝影機: {CAMERA_INDEX}")
-        print(f"解析度: {FRAME_WIDTH} x {FRAME_HEIGHT}")
+        print(f"影像來源: {self.source.describe()}")
+        print(f"偵測後端: {self.hand_backend.name}")
+        if self.stream is not None:
+            print(f"MJPEG 串流: {self.stream.url}（統計: {self.stream.url}metrics）")
+        print(f"解析度: {FRAME_WIDTH} x {FRAME_HEIGHT} (偵測: {INFERENCE_WIDTH} x {INFERENCE_HEIGHT})")
         print(f"今日不雅手勢次數: {stats['bad_gesture_count']}")
-        print(f"按 '{EXIT_KEY}' 鍵退出程式")
+        print(f"按 '{EXIT_KEY}' 鍵退出程式，按 '{SKELETON_TOGGLE_KEY}' 鍵切換手部骨架顯示")
         print("=" * 50)
 
-    def _play_warning_beep(self):
-        """高風險階段時嗶一聲（Windows 有效，其他平台就略過）"""
-        try:
-            import winsound
-            winsound.Beep(1000, 200)
-        except Exception:
-            pass
+    @staticmethod
+    def _create_action_bus():
+        """建立事件匯流排並註冊處理器"""
+        bus = ActionBus()
+        bus.subscribe(ALL_EVENTS, console_log_handler)
+        # 剛升到 high_warning 這一階時嗶一聲
+        bus.subscribe(EVENT_PENALTY_CHANGED, warning_beep_handler)
+        if ACTION_EVENT_LOG_FILE:
+            bus.subscribe(ALL_EVENTS, FileNotifier(ACTION_EVENT_LOG_FILE))
+        if ACTION_WEBHOOK_URL or ACTION_COMMAND:
+            bus.subscribe(ALL_EVENTS, CommandHook(url=ACTION_WEBHOOK_URL, command=ACTION_COMMAND))
+        return bus.start()
+
+    # ---------------------------------------------------------
+    # 偵測用影像
+    # ---------------------------------------------------------
+    def _prepare_inference_rgb(self, img):
+        """
+        產生給 MediaPipe 的 RGB 影像：必要時縮小到 INFERENCE_WIDTH x INFERENCE_HEIGHT。
+        偵測結果是正規化座標，之後直接乘上原圖寬高即可投影回全解析度。
+        """
+        h, w = img.shape[:2]
+        if (w, h) == self.inference_size:
+            return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self._inference_rgb)
+
+        if self._inference_bgr is None:
+            iw, ih = self.inference_size
+            self._inference_bgr = np.empty((ih, iw, 3), dtype=np.uint8)
+            self._inference_rgb = np.empty((ih, iw, 3), dtype=np.uint8)
+        cv2.resize(img, self.inference_size, dst=self._inference_bgr, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(self._inference_bgr, cv2.COLOR_BGR2RGB, dst=self._inference_rgb)
 
     # ---------------------------------------------------------
     # 處理單一影格
@@ -149,6 +238,13 @@ class GestureRecognitionApp:
         - 否則：做手勢偵測、馬賽克與狀態顯示
         """
         # ========= Shut Down 模式：完全黑畫面 & 停止偵測 =========
+        # 每幀重新評估等級，時間窗內的違規過期而降級後恢復正常處理
+        if self.shutdown_mode and self.tracker.get_statistics()["penalty_level"] != "shutdown":
+            self.shutdown_mode = False
+            self._last_detections = []
+            self._cached_faces = None
+            if self.motion_gate is not None:
+                self.motion_gate.reset()
         if self.shutdown_mode:
             black = np.zeros_like(img)
             text = "STREAM PAUSED"
@@ -171,60 +267,93 @@ class GestureRecognitionApp:
             return black
         # =====================================================
 
+        # 保存尚未繪製任何標記的原始影格，作為違規證據的 pre-roll
+        if self.evidence is not None:
+            self.evidence.push(img)
+            self._collect_clips()
+
         h, w, _ = img.shape
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(img_rgb)
 
-        detections = []
+        # 畫面靜止時沿用上一次的偵測結果與馬賽克區域，跳過手部 / 臉部偵測
+        infer = self.motion_gate is None or self.motion_gate.should_infer(img)
+        img_rgb = None
 
         # ---------------- 手部偵測與手勢識別 ----------------
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # 繪製骨架
-                self.visualizer.draw_landmarks(img, hand_landmarks)
-
-                # 轉成像素座標
-                landmarks, fx, fy = [], [], []
-                for lm in hand_landmarks.landmark:
-                    x_px, y_px = int(lm.x * w), int(lm.y * h)
-                    landmarks.append((x_px, y_px))
-                    fx.append(x_px)
-                    fy.append(y_px)
-
-                # 識別手勢
-                gesture_name = self.recognizer.recognize(landmarks)
-
-                detections.append(
-                    {
-                        "text": gesture_name,
-                        "landmarks": landmarks,
-                        "fx": fx,
-                        "fy": fy,
-                    }
-                )
+        if infer:
+            img_rgb = self._prepare_inference_rgb(img)
+            # legacy 後端在這裡同步偵測；live_stream 後端只送出影格，結果由回呼寫入
+            if not self.hand_backend.submit(img_rgb) and self.motion_gate is not None:
+                # 上一幀還在偵測中，這個變化沒有送出：下一幀強制再送，
+                # 不能因為之後畫面靜止就 hold() 變化之前的結果
+                self.motion_gate.reset()
+            self._cached_faces = None
+            self.face_detector.invalidate()
+        else:
+            # 畫面沒變：live_stream 目前的結果仍描述這一幀，不因為沒有送出新影格而過期
+            self.hand_backend.hold()
+            self.face_detector.hold()
+
+        # 有新的偵測結果才重新配對與識別，否則沿用上一次的結果
+        hand_landmarks = self.hand_backend.poll()
+        # debounce 只在有新結果、或動態閘門確認畫面沒變時前進；
+        # live_stream 同一個結果畫在好幾幀上時不能重複計數
+        advance_debounce = hand_landmarks is not None or not infer
+        if hand_landmarks is not None:
+            # 正規化座標投影回全解析度像素座標（寫入預先配置的 (N, 21, 2) 緩衝區）
+            detections = self.hand_pool.extract(hand_landmarks, w, h)
+
+            # 跨幀配對，讓每隻手有自己的平滑 / debounce 狀態
+            self.hand_tracks.update(detections, self.hand_pool.points, w, h)
+
+            if detections:
+                # 所有手一次批次識別
+                codes = self.recognizer.classify_batch(self.hand_pool.points[:len(detections)])
+                for hand, code in zip(detections, codes):
+                    hand.code = int(code)
+                    hand.text = GESTURE_LABELS[code]
+
+            self._last_detections = detections
+        else:
+            detections = self._last_detections
+
+        if detections:
+            # 所有手的骨架一次繪製（detections 依序對應 hand_pool 緩衝區的前 N 筆）
+            if self.draw_skeleton:
+                self.visualizer.draw_skeletons(img, self.hand_pool.points[:len(detections)])
 
             # 更新不雅手勢狀態 & 計數
-            self.update_gesture_status(detections)
+            if advance_debounce:
+                self.update_gesture_status(detections)
 
-            # 決定是否對手部做馬賽克
+            # 決定是否對手部做馬賽克（每隻手依自己的追蹤狀態判斷）
             # 需求：不要再顯示白色的 bad!!! / fist / good 等文字，只保留紅色的 bad / blocked（由馬賽克警告框顯示）
-            for d in detections:
-                text = d["text"]
+            tracks = self.hand_tracks
+            for hand in detections:
+                slot = hand.slot
                 should_mosaic = (
-                    text in BLACKLIST_GESTURES
-                    and text == self.gesture_buffer_text
-                    and self.gesture_buffer_count >= DEBOUNCE_FRAMES
+                    self._blacklist_codes[hand.code]
+                    and slot >= 0
+                    and tracks.gesture_codes[slot] == hand.code
+                    and tracks.gesture_counts[slot] >= DEBOUNCE_FRAMES
                 )
 
                 if should_mosaic:
-                    self.visualizer.apply_hand_mosaic(
-                        img, d["landmarks"], d["fx"], d["fy"], w, h
-                    )
-                # 否則不畫任何手勢文字（避免出現白色 bad!!! / fist / good 等字）
+                    bbox = self.visualizer.apply_hand_mosaic(img, hand, w, h, tracks.prev_bbox(slot))
+                    tracks.set_bbox(slot, bbox)
+                else:
+                    # 否則不畫任何手勢文字（避免出現白色 bad!!! / fist / good 等字）
+                    tracks.set_bbox(slot, None)
 
         # ---------------- 臉部馬賽克（達到閾值後） ----------------
         if self.tracker.face_mosaic_enabled:
-            faces = self.face_detector.detect(img)
+            faces = self._cached_faces
+            if faces is None:
+                if img_rgb is None and self.face_detector.needs_frame:
+                    img_rgb = self._prepare_inference_rgb(img)
+                faces = self.face_detector.detect(img, img_rgb)
+                # live_stream 的結果還在路上或剛過期時不快取，下一幀繼續取回
+                if self.face_detector.settled:
+                    self._cached_faces = faces
             self.visualizer.draw_face_mosaic(img, faces)
 
         # ---------------- 狀態顯示 & 檢查是否進入 Shut Down ----------------
@@ -242,83 +371,147 @@ class GestureRecognitionApp:
     # 更新不雅手勢計數（無 Shut Down 時才會動）
     # ---------------------------------------------------------
     def update_gesture_status(self, detections):
-        """更新手勢狀態與計數（含多段懲罰邏輯）"""
+        """更新每隻手的手勢狀態與計數（含多段懲罰邏輯）"""
         if self.shutdown_mode:
             return  # 已經 shut down 就不再計數
 
-        frame_candidates = [
-            d["text"] for d in detections if d["text"] in BLACKLIST_GESTURES
-        ]
-
-        if frame_candidates:
-            # 同一幀可能兩隻手，比較常出現的那一種
-            candidate = max(set(frame_candidates), key=frame_candidates.count)
-
-            if candidate == self.gesture_buffer_text:
-                self.gesture_buffer_count += 1
-
-                if (
-                    self.gesture_buffer_count >= DEBOUNCE_FRAMES
-                    and not self.current_gesture_logged
-                ):
-                    # 真的算一次不雅手勢
-                    result = self.tracker.add_bad_gesture(candidate)
-                    self.current_gesture_logged = True
-
-                    # 剛從 high_warning 這一階升級時嗶一聲
-                    if result["level_changed"] and result["penalty_level"] == "high_warning":
-                        self._play_warning_beep()
-            else:
-                # 換另一種手勢 → 重置 buffer
-                self.gesture_buffer_text = candidate
-                self.gesture_buffer_count = 1
-                self.current_gesture_logged = False
-        else:
-            # 這一幀沒有任何黑名單手勢
-            self.gesture_buffer_text = ""
-            self.gesture_buffer_count = 0
-            self.current_gesture_logged = False
-
-    def run(self):
-        """啟動主迴圈"""
-        if not self.cap.isOpened():
-            print("錯誤：無法開啟攝影機")
+        tracks = self.hand_tracks
+        crossed = []
+        for hand in detections:
+            slot = hand.slot
+            if slot < 0:
+                continue
+
+            # 非黑名單手勢 → 該手的 buffer 歸零
+            code = hand.code if self._blacklist_codes[hand.code] else 0
+            count = tracks.debounce(slot, code)
+
+            if count >= DEBOUNCE_FRAMES and not tracks.logged[slot]:
+                crossed.append(hand)
+        if not crossed:
             return
 
+        # debounce 各手獨立，但同一段違規只記錄一次：
+        # 本幀有多隻手同時達標，或其他手已在這段違規中記錄過，都不再重複記錄
+        episode_logged = tracks.logged.any()
+        for hand in crossed:
+            tracks.logged[hand.slot] = True
+        if episode_logged:
+            return
+
+        # 真的算一次不雅手勢（警告音等副作用由事件匯流排在背景處理）
+        gesture = crossed[0].text
+        self.tracker.add_bad_gesture(gesture)
+        if self.evidence is not None:
+            # 影片在背景寫入，成功後才由 _collect_clips() 記到這筆違規紀錄上
+            clip = self.evidence.trigger(gesture)
+            self._pending_clips[clip] = self.tracker.violations[-1]
+
+    def _collect_clips(self):
+        """把已寫入完成的違規影片路徑補到對應的紀錄上（寫入失敗的不記錄）"""
+        for clip, frames in self.evidence.poll_finished():
+            record = self._pending_clips.pop(clip, None)
+            if record is not None and frames:
+                self.tracker.attach_clip(record, clip)
+
+    def run(self, max_frames=None):
+        """
+        啟動主迴圈
+
+        Args:
+            max_frames: 處理指定幀數後結束，None 代表直到來源結束或按下退出鍵
+
+        Returns:
+            int: 實際處理的幀數
+        """
+        if not self.source.isOpened():
+            print("錯誤：無法開啟影像來源")
+            return 0
+
         print("系統運行中...")
 
+        frame_count = 0
+        start = time.perf_counter()
         try:
-            while True:
-                ret, img = self.cap.read()
+            while max_frames is None or frame_count < max_frames:
+                # 來源已協商好目標解析度，不需要逐幀 resize
+                ret, img = self.source.read()
                 if not ret:
                     break
 
-                img = cv2.resize(img, (FRAME_WIDTH, FRAME_HEIGHT))
-
                 # 處理畫面（含多段懲罰與 Shut Down 邏輯）
                 img = self.process_frame(img)
+                frame_count += 1
 
-                # 顯示畫面
-                cv2.imshow(WINDOW_NAME, img)
+                # 交給串流的編碼執行緒（只保存參照，觀看者數量不影響這裡的成本）
+                if self.stream is not None:
+                    self.stream.publish(img)
 
-                if cv2.waitKey(5) == ord(EXIT_KEY):
-                    print("\n程式結束，重置計數")
-                    self.tracker.reset()
-                    break
+                # 顯示畫面
+                if self.display:
+                    cv2.imshow(WINDOW_NAME, img)
+
+                    key = cv2.waitKey(5)
+                    if key == ord(EXIT_KEY):
+                        print("\n程式結束，重置計數")
+                        # 只重置今日計數，違規時間戳保留給下次啟動的滑動時間窗
+                        self.tracker.reset(clear_history=False)
+                        break
+                    if key == ord(SKELETON_TOGGLE_KEY):
+                        self.draw_skeleton = not self.draw_skeleton
         finally:
+            elapsed = time.perf_counter() - start
+            if frame_count and elapsed > 0:
+                print(f"共處理 {frame_count} 幀，平均 {frame_count / elapsed:.1f} FPS")
             self.cleanup()
+        return frame_count
 
     def cleanup(self):
         """清理資源"""
-        self.cap.release()
-        self.hands.close()
-        cv2.destroyAllWindows()
-        print("攝影機已關閉")
-
-
-def main():
-    app = GestureRecognitionApp()
-    app.run()
+        self.source.release()
+        self.hand_backend.close()
+        self.face_detector.close()
+        print(f"偵測後端: {self.hand_backend.get_statistics()}")
+        if self.stream is not None:
+            self.stream.stop()
+        if self.evidence is not None:
+            self.evidence.close()
+            self._collect_clips()
+        self.bus.stop()
+        self.tracker.flush()
+        print(f"事件匯流排: {self.bus.get_statistics()}")
+        if self.display:
+            cv2.destroyAllWindows()
+        print("影像來源已關閉")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='手勢識別系統')
+    parser.add_argument('--source', default='camera',
+                        help="影像來源：camera[:index]、video:<path>、images:<dir>、synthetic[:frames]")
+    parser.add_argument('--no-display', action='store_true', help='不開啟顯示視窗（CI / 無螢幕環境）')
+    parser.add_argument('--max-frames', type=int, default=None, help='處理指定幀數後結束')
+    parser.add_argument('--backend', choices=BACKENDS, default=DETECTION_BACKEND,
+                        help='偵測後端：legacy（同步）或 live_stream（MediaPipe Tasks 非同步）')
+    parser.add_argument('--mjpeg', type=int, nargs='?', const=MJPEG_PORT,
+                        default=MJPEG_PORT if MJPEG_ENABLED else None, metavar='PORT',
+                        help=f'開啟本機 MJPEG 串流（預設埠號 {MJPEG_PORT}）')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'效能分析模式：處理固定幀數（預設 {PROFILE_FRAMES}）並輸出熱點報告到 {PROFILE_DIR}/')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = GestureRecognitionApp(source=open_source(args.source), display=not args.no_display,
+                                backend=args.backend, mjpeg_port=args.mjpeg)
+    if not args.profile:
+        app.run(max_frames=args.max_frames)
+        return
+
+    # 只分析主迴圈，不含模型載入等初始化成本
+    with ProfileSession(f'main-{args.backend}') as session:
+        session.frames = app.run(max_frames=args.max_frames or PROFILE_FRAMES)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,260 @@
+"""
+MJPEG 串流模組
+在本機以 HTTP multipart/x-mixed-replace 提供已打碼的輸出畫面，
+每幀只在專用的編碼執行緒中壓縮一次，再把同一份 bytes 分送給所有觀看者；
+影格迴圈只需呼叫 publish()（保存影格參照，不複製、不等待）
+
+端點：
+    /            串流（multipart MJPEG，可直接用瀏覽器或 VLC 開啟）
+    /metrics     JSON 統計：編碼耗時、各連線已送出 / 丟棄幀數與延遲
+"""
+
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+from config import MJPEG_HOST, MJPEG_PORT, MJPEG_JPEG_QUALITY
+
+_BOUNDARY = 'frame'
+
+
+class _ClientStats:
+    """
+    單一觀看者的統計
+
+    dropped / lag_ms 只在送完一幀後更新，卡在 write 的觀看者不會自己回報；
+    to_dict() 以最後送出的序號與發布時間，對照目前最新的一段與現在時間計算落後程度。
+    """
+
+    __slots__ = ('client_id', 'address', 'connected_at', 'sent', 'dropped', 'lag_ms',
+                 'last_seq', 'last_published_at')
+
+    def __init__(self, client_id, address, seq):
+        self.client_id = client_id
+        self.address = address
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.lag_ms = 0.0
+        self.last_seq = seq                           # 最後送出（或連線時）的序號
+        self.last_published_at = time.perf_counter()  # 該影格的發布時間
+
+    def to_dict(self, head_seq, now):
+        """
+        Args:
+            head_seq: 目前最新一段的序號
+            now: 目前的 time.perf_counter()
+        """
+        behind = max(0, head_seq - self.last_seq)
+        # 比最新一段更舊、還沒送出的影格已經不可能再送，先計入丟棄
+        dropped = self.dropped + max(0, behind - 1)
+        # 有更新的影格還沒送出時，觀看者看到的畫面隨時間變舊
+        lag_ms = (now - self.last_published_at) * 1000 if behind else self.lag_ms
+        return {
+            'id': self.client_id,
+            'address': f"{self.address[0]}:{self.address[1]}",
+            'connected_seconds': round(time.time() - self.connected_at, 1),
+            'sent': self.sent,
+            'behind': behind,
+            'dropped': dropped,
+            'lag_ms': round(lag_ms, 1),
+        }
+
+
+class MjpegServer:
+    """
+    編碼一次、分送多個觀看者的 MJPEG 伺服器
+
+    - publish(frame)：影格迴圈呼叫，只保存最新影格的參照並喚醒編碼執行緒
+    - 編碼執行緒：取最新影格壓縮成 JPEG，連同 multipart 標頭組成一段 bytes
+    - 每個連線各自的執行緒：等待新的一段並送出；送出期間錯過的影格直接略過並計入 dropped，
+      慢的觀看者不會拖慢編碼或其他觀看者
+
+    publish() 之後呼叫端不可再修改該影格（來源每幀都會產生新的陣列）。
+    """
+
+    def __init__(self, host=MJPEG_HOST, port=MJPEG_PORT, quality=MJPEG_JPEG_QUALITY):
+        """
+        Args:
+            host: 監聽位址（預設只限本機）
+            port: 監聽埠號，0 代表由系統指定
+            quality: JPEG 品質 (0 ~ 100)
+        """
+        self.host = host
+        self.port = port
+        self._encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+
+        # 影格迴圈 -> 編碼執行緒
+        self._pending = None   # (影格, 發布時間)
+        self._pending_lock = threading.Lock()
+        self._frame_ready = threading.Event()
+
+        # 編碼執行緒 -> 觀看者
+        self._part = None      # 最新一段 multipart bytes
+        self._part_seq = 0
+        self._part_time = 0.0  # 該影格的發布時間
+        self._part_cond = threading.Condition()
+
+        self._clients = {}
+        self._client_ids = itertools.count(1)
+        self._running = False
+        self._server = None
+        self._threads = []
+
+        # 統計資訊
+        self.published = 0
+        self.encoded = 0
+        self.superseded = 0    # 編碼前就被更新影格取代的幀數
+        self._encode_total = 0.0
+
+    # ---------------------------------------------------------
+    # 影格迴圈
+    # ---------------------------------------------------------
+    def publish(self, frame):
+        """保存最新影格（永不阻塞，不複製）"""
+        with self._pending_lock:
+            if self._pending is not None:
+                self.superseded += 1
+            self._pending = (frame, time.perf_counter())
+        self.published += 1
+        self._frame_ready.set()
+
+    # ---------------------------------------------------------
+    # 啟動 / 停止
+    # ---------------------------------------------------------
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _StreamHandler)
+        self._server.daemon_threads = True
+        self._server.stream = self
+        self.port = self._server.server_address[1]
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._encode_loop, name='mjpeg-encoder', daemon=True),
+            threading.Thread(target=self._server.serve_forever, name='mjpeg-http', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self._frame_ready.set()
+        with self._part_cond:
+            self._part_cond.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    # ---------------------------------------------------------
+    # 編碼執行緒
+    # ---------------------------------------------------------
+    def _encode_loop(self):
+        while True:
+            self._frame_ready.wait()
+            if not self._running:
+                break
+            with self._pending_lock:
+                pending, self._pending = self._pending, None
+                self._frame_ready.clear()
+            if pending is None:
+                continue
+
+            frame, published_at = pending
+            start = time.perf_counter()
+            ok, jpeg = cv2.imencode('.jpg', frame, self._encode_params)
+            self._encode_total += time.perf_counter() - start
+            if not ok:
+                continue
+            header = (f"--{_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                      f"Content-Length: {len(jpeg)}\r\n\r\n").encode('ascii')
+            part = header + jpeg.tobytes() + b'\r\n'
+
+            with self._part_cond:
+                self._part = part
+                self._part_seq += 1
+                self._part_time = published_at
+                self._part_cond.notify_all()
+            self.encoded += 1
+
+    # ---------------------------------------------------------
+    # 觀看者（每個連線在自己的 HTTP 執行緒中執行）
+    # ---------------------------------------------------------
+    def _serve_client(self, wfile, address):
+        last_seq = self._part_seq
+        client = _ClientStats(next(self._client_ids), address, last_seq)
+        self._clients[client.client_id] = client
+        try:
+            while self._running:
+                with self._part_cond:
+                    self._part_cond.wait_for(
+                        lambda: self._part_seq != last_seq or not self._running, timeout=1.0
+                    )
+                    seq, part, published_at = self._part_seq, self._part, self._part_time
+                if seq == last_seq or part is None:
+                    continue
+                if seq - last_seq > 1:
+                    client.dropped += seq - last_seq - 1
+                last_seq = seq
+
+                wfile.write(part)
+                wfile.flush()
+                client.sent += 1
+                client.lag_ms = (time.perf_counter() - published_at) * 1000
+                client.last_published_at = published_at
+                client.last_seq = seq
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self._clients.pop(client.client_id, None)
+
+    def get_statistics(self):
+        """獲取統計資訊（觀看者的落後程度以現在時間計算，卡住的連線也看得出來）"""
+        head_seq, now = self._part_seq, time.perf_counter()
+        return {
+            'published': self.published,
+            'encoded': self.encoded,
+            'superseded': self.superseded,
+            'mean_encode_ms': self._encode_total / self.encoded * 1000 if self.encoded else 0.0,
+            'clients': [client.to_dict(head_seq, now) for client in list(self._clients.values())],
+        }
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    """HTTP 請求處理（self.server.stream 為對應的 MjpegServer）"""
+
+    def do_GET(self):
+        stream = self.server.stream
+        if self.path == '/metrics':
+            body = json.dumps(stream.get_statistics(), ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path not in ('/', '/stream.mjpg'):
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={_BOUNDARY}')
+        self.send_header('Cache-Control', 'no-cache, private')
+        self.send_header('Pragma', 'no-cache')
+        self.end_headers()
+        stream._serve_client(self.wfile, self.client_address)
+
+    def log_message(self, format, *args):
+        # 不在主控台輸出每個請求
+        pass
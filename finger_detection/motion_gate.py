@@ -0,0 +1,94 @@
+"""
+動態閘門模組
+以縮小的灰階影像與上次偵測時的參考影像做差分，
+畫面靜止時跳過手部 / 臉部偵測並沿用上一幀的結果，並定期強制重新偵測
+"""
+
+import cv2
+import numpy as np
+
+from config import MOTION_CELL_SIZE, MOTION_CELL_THRESHOLD, MOTION_REFRESH_INTERVAL
+
+
+class MotionGate:
+    """
+    畫面以 MOTION_CELL_SIZE x MOTION_CELL_SIZE 像素為一格縮小成灰階網格（每格為區域平均），
+    只要任一格與參考影像的差異超過門檻就視為有動態。
+    縮放倍率固定為整數（多餘的邊緣像素不計），INTER_AREA 才能走快速路徑。
+    參考影像只在實際偵測時更新，因此緩慢累積的變化也會被偵測到。
+    """
+
+    def __init__(self, cell_size=MOTION_CELL_SIZE, threshold=MOTION_CELL_THRESHOLD,
+                 refresh_interval=MOTION_REFRESH_INTERVAL):
+        """
+        Args:
+            cell_size: 每格的邊長（像素）
+            threshold: 單格灰階差異門檻 (0 ~ 255)
+            refresh_interval: 最多連續跳過幾幀就強制重新偵測
+        """
+        self.cell_size = cell_size
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+
+        # 網格緩衝區依第一幀的尺寸配置
+        self.grid_size = None
+        self._small = self._gray = self._diff = self._reference = None
+        self._has_reference = False
+        self.frames_since_refresh = 0
+
+        # 統計資訊
+        self.inferred_frames = 0
+        self.skipped_frames = 0
+
+    def should_infer(self, img):
+        """
+        判斷這一幀是否需要重新偵測
+
+        Args:
+            img: BGR 影像
+
+        Returns:
+            bool: True 表示畫面有變化（或到了強制更新時間），需要重新偵測
+        """
+        h, w = img.shape[:2]
+        gw, gh = max(1, w // self.cell_size), max(1, h // self.cell_size)
+        if self.grid_size != (gw, gh):
+            self._allocate(gw, gh)
+
+        region = img[:gh * self.cell_size, :gw * self.cell_size]
+        cv2.resize(region, self.grid_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self._has_reference and self.frames_since_refresh < self.refresh_interval:
+            cv2.absdiff(self._gray, self._reference, dst=self._diff)
+            if int(self._diff.max()) <= self.threshold:
+                self.frames_since_refresh += 1
+                self.skipped_frames += 1
+                return False
+
+        np.copyto(self._reference, self._gray)
+        self._has_reference = True
+        self.frames_since_refresh = 0
+        self.inferred_frames += 1
+        return True
+
+    def _allocate(self, gw, gh):
+        self.grid_size = (gw, gh)
+        self._small = np.empty((gh, gw, 3), dtype=np.uint8)
+        self._gray = np.empty((gh, gw), dtype=np.uint8)
+        self._diff = np.empty((gh, gw), dtype=np.uint8)
+        self._reference = np.empty((gh, gw), dtype=np.uint8)
+        self._has_reference = False
+
+    def reset(self):
+        """下一幀強制重新偵測"""
+        self._has_reference = False
+
+    def get_statistics(self):
+        """獲取統計資訊"""
+        total = self.inferred_frames + self.skipped_frames
+        return {
+            'inferred_frames': self.inferred_frames,
+            'skipped_frames': self.skipped_frames,
+            'skip_ratio': self.skipped_frames / total if total else 0.0,
+        }
@@ -0,0 +1,148 @@
+"""
+懲罰引擎模組
+以滑動時間窗（例如最近 10 分鐘、最近 24 小時）與衰減分數計算違規次數，
+依設定檔中的多個等級判斷目前的懲罰等級；每幀查詢的成本為攤銷 O(1)
+"""
+
+import math
+import time
+from collections import deque
+
+from config import (
+    PENALTY_WINDOWS, PENALTY_TIERS, PENALTY_BUCKET_SECONDS, PENALTY_DECAY_HALF_LIFE,
+)
+
+# 特殊時間窗名稱：使用指數衰減分數而非次數
+DECAY_WINDOW = 'decay'
+
+
+class SlidingWindowCounter:
+    """
+    以時間桶（bucket）累計的滑動時間窗計數器
+
+    每個桶涵蓋 bucket_seconds 秒，過期的桶從佇列左側移除並扣掉總數，
+    新增與查詢皆為攤銷 O(1)，記憶體上限為 window / bucket 個桶。
+    """
+
+    __slots__ = ('window', 'bucket', '_buckets', '_total')
+
+    def __init__(self, window_seconds, bucket_seconds=PENALTY_BUCKET_SECONDS):
+        self.window = window_seconds
+        self.bucket = min(bucket_seconds, window_seconds)
+        self._buckets = deque()  # [bucket_start, count]
+        self._total = 0
+
+    def _expire(self, now):
+        cutoff = now - self.window
+        buckets = self._buckets
+        # 桶的結束時間早於 cutoff 才整桶移除（精度為一個桶）
+        while buckets and buckets[0][0] + self.bucket <= cutoff:
+            self._total -= buckets.popleft()[1]
+
+    def add(self, now, n=1):
+        start = now - (now % self.bucket)
+        buckets = self._buckets
+        if buckets and buckets[-1][0] == start:
+            buckets[-1][1] += n
+        else:
+            buckets.append([start, n])
+        self._total += n
+        self._expire(now)
+
+    def count(self, now):
+        self._expire(now)
+        return self._total
+
+    def reset(self):
+        self._buckets.clear()
+        self._total = 0
+
+
+class DecayingScore:
+    """指數衰減分數：每次違規 +1，每經過 half_life 秒減半"""
+
+    __slots__ = ('half_life', '_value', '_updated')
+
+    def __init__(self, half_life=PENALTY_DECAY_HALF_LIFE):
+        self.half_life = half_life
+        self._value = 0.0
+        self._updated = 0.0
+
+    def _decayed(self, now):
+        if self._value == 0.0:
+            return 0.0
+        return self._value * math.pow(0.5, max(0.0, now - self._updated) / self.half_life)
+
+    def add(self, now, n=1):
+        self._value = self._decayed(now) + n
+        self._updated = now
+
+    def value(self, now):
+        return self._decayed(now)
+
+    def reset(self):
+        self._value = 0.0
+        self._updated = 0.0
+
+
+class PenaltyEngine:
+    """多時間窗懲罰引擎"""
+
+    def __init__(self, windows=PENALTY_WINDOWS, tiers=PENALTY_TIERS,
+                 bucket_seconds=PENALTY_BUCKET_SECONDS, decay_half_life=PENALTY_DECAY_HALF_LIFE,
+                 clock=time.time):
+        """
+        Args:
+            windows: {名稱: 秒數} 的滑動時間窗設定
+            tiers: [(等級, 時間窗名稱, 門檻), ...]，由嚴重到輕微排列，第一個達到門檻的等級生效；
+                   時間窗名稱為 'decay' 時以衰減分數比較
+            bucket_seconds: 時間桶大小（秒）
+            decay_half_life: 衰減分數的半衰期（秒）
+            clock: 取得目前時間（秒）的函式
+        """
+        self.counters = {
+            name: SlidingWindowCounter(seconds, bucket_seconds) for name, seconds in windows.items()
+        }
+        self.score = DecayingScore(decay_half_life)
+        self.clock = clock
+
+        for level, window, _ in tiers:
+            if window != DECAY_WINDOW and window not in self.counters:
+                raise ValueError(f"懲罰等級 {level} 使用了未定義的時間窗: {window}")
+        self.tiers = tuple(tiers)
+
+    def record(self, now=None, n=1):
+        """記錄 n 次違規"""
+        now = self.clock() if now is None else now
+        for counter in self.counters.values():
+            counter.add(now, n)
+        self.score.add(now, n)
+
+    def seed(self, timestamps):
+        """以既有的違規時間（秒）初始化，時間需由舊到新"""
+        for t in timestamps:
+            self.record(t)
+
+    def counts(self, now=None):
+        """各時間窗目前的違規次數（含衰減分數）"""
+        now = self.clock() if now is None else now
+        result = {name: counter.count(now) for name, counter in self.counters.items()}
+        result[DECAY_WINDOW] = round(self.score.value(now), 3)
+        return result
+
+    def level(self, now=None):
+        """目前的懲罰等級（沒有任何等級達標時為 'normal'）"""
+        now = self.clock() if now is None else now
+        for level, window, threshold in self.tiers:
+            if window == DECAY_WINDOW:
+                value = self.score.value(now)
+            else:
+                value = self.counters[window].count(now)
+            if value >= threshold:
+                return level
+        return 'normal'
+
+    def reset(self):
+        for counter in self.counters.values():
+            counter.reset()
+        self.score.reset()
@@ -0,0 +1,214 @@
+"""
+效能分析模組
+--profile 模式同時收集確定性（cProfile）與取樣式（定時擷取呼叫堆疊）的分析結果，
+輸出 .prof（可用 snakeviz / pstats 檢視）、collapsed stacks（可直接餵給 flamegraph.pl / speedscope）
+以及依模組篩選的熱點函式報告，讓不同場域的分析結果可以直接比較
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from config import PROFILE_DIR, PROFILE_SAMPLE_INTERVAL, PROFILE_TOP_N, PROFILE_MODULES
+
+
+def _module_name(filename):
+    """檔案路徑 -> 模組名稱（不含副檔名），內建函式回傳原字串"""
+    if filename.startswith('<') or filename == '~':
+        return filename
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{_module_name(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """
+    取樣式分析器
+    背景執行緒每隔 interval 秒擷取目標執行緒的呼叫堆疊，統計每條堆疊出現的次數
+    """
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL, thread_id=None, all_threads=False):
+        """
+        Args:
+            interval: 取樣間隔（秒）
+            thread_id: 要取樣的執行緒 ident，預設為建立分析器的執行緒
+            all_threads: 取樣所有執行緒（堆疊最外層加上執行緒名稱），用於工作在背景執行緒的服務
+        """
+        self.interval = interval
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self.all_threads = all_threads
+        self.stacks = Counter()  # (root, ..., leaf) -> 取樣次數
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.all_threads:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                targets = [(ident, frame) for ident, frame in frames.items() if ident != own]
+            else:
+                names = None
+                frame = frames.get(self.thread_id)
+                targets = [] if frame is None else [(self.thread_id, frame)]
+            for ident, frame in targets:
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if names is not None:
+                    stack.append(f"thread:{names.get(ident, ident)}")
+                stack.reverse()
+                self.stacks[tuple(stack)] += 1
+                self.samples += 1
+
+    def hot_functions(self, modules=None):
+        """
+        Returns:
+            list: [(函式, 自身取樣數, 含子呼叫取樣數), ...]，依含子呼叫取樣數排序
+        """
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack[-1]] += count
+            for label in set(stack):
+                total_counts[label] += count
+        rows = [
+            (label, self_counts[label], total)
+            for label, total in total_counts.items()
+            if modules is None or label.split(':', 1)[0] in modules
+        ]
+        rows.sort(key=lambda row: (row[2], row[1]), reverse=True)
+        return rows
+
+    def write_collapsed(self, path):
+        """輸出 collapsed stacks 格式（每行 "a;b;c 次數"）"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+
+class ProfileSession:
+    """
+    同時啟動 cProfile 與取樣式分析器的 context manager，結束時寫出結果並印出報告
+
+    用法：
+        with ProfileSession('main') as session:
+            session.frames = app.run(max_frames=300)
+    """
+
+    def __init__(self, name, out_dir=PROFILE_DIR, modules=PROFILE_MODULES,
+                 sample_interval=PROFILE_SAMPLE_INTERVAL, top_n=PROFILE_TOP_N,
+                 all_threads=False, unit='幀'):
+        """
+        Args:
+            name: 輸出檔名前綴（通常為進入點名稱）
+            out_dir: 輸出目錄
+            modules: 報告關注的模組名稱
+            sample_interval: 取樣間隔（秒）
+            top_n: 每個表格列出的函式數量
+            all_threads: 取樣所有執行緒（cProfile 仍只涵蓋建立 session 的執行緒）
+            unit: 報告中每單位成本的名稱（幀、請求…）
+        """
+        self.name = name
+        self.out_dir = out_dir
+        self.modules = tuple(modules)
+        self.top_n = top_n
+        self.unit = unit
+        self.frames = 0  # 由呼叫端填入處理的幀數（或其他單位數），用來計算每單位成本
+
+        self.profiler = cProfile.Profile()
+        self.sampler = SamplingProfiler(sample_interval, all_threads=all_threads)
+        self.elapsed = 0.0
+        self.paths = {}
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        self.sampler.start()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.disable()
+        self.sampler.stop()
+        self.elapsed = time.perf_counter() - self._start
+        self.write()
+        return False
+
+    def write(self):
+        """寫出 .prof、.collapsed 與 .txt 報告"""
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"{self.name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        self.paths = {
+            'prof': base + '.prof',
+            'collapsed': base + '.collapsed',
+            'report': base + '.txt',
+        }
+        self.profiler.dump_stats(self.paths['prof'])
+        self.sampler.write_collapsed(self.paths['collapsed'])
+
+        report = self.format_report()
+        with open(self.paths['report'], 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+        print(report)
+
+    def _deterministic_rows(self):
+        stats = pstats.Stats(self.profiler).stats
+        rows = []
+        for (filename, lineno, func), (_, calls, tottime, cumtime, _) in stats.items():
+            module = _module_name(filename)
+            if module in self.modules:
+                rows.append((f"{module}:{func}", lineno, calls, tottime, cumtime))
+        rows.sort(key=lambda row: row[4], reverse=True)
+        return rows[:self.top_n]
+
+    def format_report(self):
+        """依模組篩選的熱點函式報告"""
+        frames = self.frames or 0
+        per_frame = 1000.0 / frames if frames else 0.0
+        lines = [
+            f"效能分析: {self.name}",
+            f"共 {frames} {self.unit}，{self.elapsed:.2f} 秒"
+            + (f"（平均 {self.elapsed * per_frame:.2f} ms/{self.unit}）" if frames else ""),
+            f"關注模組: {', '.join(self.modules)}",
+            "",
+            "[確定性分析 cProfile] 依累計時間排序",
+            f"{'cum ms':>10} {'self ms':>10} {'ms/' + self.unit:>8} {'calls':>9}  函式",
+        ]
+        for label, lineno, calls, tottime, cumtime in self._deterministic_rows():
+            lines.append(f"{cumtime * 1000:>10.1f} {tottime * 1000:>10.1f} "
+                         f"{cumtime * per_frame:>8.3f} {calls:>9}  {label} (line {lineno})")
+
+        samples = self.sampler.samples
+        lines += [
+            "",
+            f"[取樣式分析] 共 {samples} 個樣本，間隔 {self.sampler.interval * 1000:.1f} ms",
+            f"{'total %':>8} {'self %':>8}  函式",
+        ]
+        for label, self_count, total in self.sampler.hot_functions(self.modules)[:self.top_n]:
+            lines.append(f"{total / samples:>8.1%} {self_count / samples:>8.1%}  {label}")
+
+        lines += ["", "輸出檔案:"] + [f"  {kind}: {path}" for kind, path in self.paths.items()]
+        return '\n'.join(lines)
@@ -5,7 +5,6 @@
 
 import cv2
 import numpy as np
-import mediapipe as mp
 from config import (
     BBOX_PADDING_RATIO, BBOX_EXTRA_PADDING, BBOX_MIN_DIMENSION, BBOX_SMOOTH_ALPHA,
     MOSAIC_DOWN_SAMPLE_MIN, MOSAIC_DOWN_SAMPLE_MAX, MOSAIC_DOWN_SAMPLE_DIVISOR,
@@ -13,27 +12,74 @@ from config import (
     WARNING_TEXT, WARNING_FONT_SCALE, WARNING_THICKNESS, WARNING_COLOR,
     WARNING_BG_COLOR, WARNING_BG_PADDING,
     FACE_MOSAIC_LEVEL, FACE_MOSAIC_WARNING_TEXT, FACE_MOSAIC_WARNING_COLOR,
-    FACE_MOSAIC_WARNING_FONT_SCALE, FACE_MOSAIC_WARNING_THICKNESS
+    FACE_MOSAIC_WARNING_FONT_SCALE, FACE_MOSAIC_WARNING_THICKNESS,
+    SKELETON_LINE_THICKNESS, SKELETON_POINT_RADIUS
 )
 
+# ==================== 手部骨架樣式（沿用 MediaPipe 預設配色，BGR） ====================
+# 連線：以折線表示，同顏色的折線一次畫完
+_SKELETON_LINES = (
+    ((128, 128, 128), ((0, 5, 9, 13, 17, 0), (0, 1))),  # 手掌
+    ((180, 229, 255), ((1, 2, 3, 4),)),                  # 拇指
+    ((128, 64, 128), ((5, 6, 7, 8),)),                   # 食指
+    ((0, 204, 255), ((9, 10, 11, 12),)),                 # 中指
+    ((48, 255, 48), ((13, 14, 15, 16),)),                # 無名指
+    ((192, 101, 21), ((17, 18, 19, 20),)),               # 小指
+)
+# 關鍵點：以長度為 0 的粗線段畫成圓點（白色外框 + 彩色內點）
+_SKELETON_POINTS = (
+    ((48, 48, 255), (0, 1, 5, 9, 13, 17)),
+    ((180, 229, 255), (2, 3, 4)),
+    ((128, 64, 128), (6, 7, 8)),
+    ((0, 204, 255), (10, 11, 12)),
+    ((48, 255, 48), (14, 15, 16)),
+    ((192, 101, 21), (18, 19, 20)),
+)
+SKELETON_BORDER_COLOR = (224, 224, 224)
+
+
 class Visualizer:
     def __init__(self):
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
-        self.mp_hands = mp.solutions.hands
-        self.prev_bbox = None
         self.fontFace = cv2.FONT_HERSHEY_SIMPLEX
         self.lineType = cv2.LINE_AA
 
-    def draw_landmarks(self, img, hand_landmarks):
-        """繪製手部骨架"""
-        self.mp_drawing.draw_landmarks(
-            img,
-            hand_landmarks,
-            self.mp_hands.HAND_CONNECTIONS,
-            self.mp_drawing_styles.get_default_hand_landmarks_style(),
-            self.mp_drawing_styles.get_default_hand_connections_style()
-        )
+        # 預先建好每種顏色的索引陣列，每幀只需要一次 fancy indexing
+        self._line_styles = [
+            (color, [np.array(chain, dtype=np.intp) for chain in chains])
+            for color, chains in _SKELETON_LINES
+        ]
+        self._point_styles = [
+            (color, np.repeat(np.array(indices, dtype=np.intp), 2))
+            for color, indices in _SKELETON_POINTS
+        ]
+        self._all_points = np.repeat(np.arange(21, dtype=np.intp), 2)
+
+    def draw_skeletons(self, img, points):
+        """
+        一次繪製所有手的骨架：每種顏色一次 cv2.polylines，呼叫次數與手數無關
+
+        Args:
+            img: BGR 影像
+            points: (N, 21, 2) int32 像素座標
+        """
+        n = len(points)
+        if n == 0:
+            return
+
+        for color, chains in self._line_styles:
+            for chain in chains:
+                # (N, len(chain), 2)：每隻手一條折線
+                # np.take 產生連續記憶體（points[:, chain] 的 strides 不連續，OpenCV 不接受）
+                cv2.polylines(img, np.take(points, chain, axis=1), False, color,
+                              SKELETON_LINE_THICKNESS, cv2.LINE_8)
+
+        # (N * 21, 2, 2)：起點等於終點的線段，粗細即為圓點直徑
+        border = 2 * (SKELETON_POINT_RADIUS + 1)
+        cv2.polylines(img, np.take(points, self._all_points, axis=1).reshape(-1, 2, 2), False,
+                      SKELETON_BORDER_COLOR, border, cv2.LINE_8)
+        for color, indices in self._point_styles:
+            cv2.polylines(img, np.take(points, indices, axis=1).reshape(-1, 2, 2), False, color,
+                          2 * SKELETON_POINT_RADIUS, cv2.LINE_8)
 
     def draw_gesture_text(self, img, text):
         """顯示手勢名稱"""
@@ -54,16 +100,25 @@ class Visualizer:
             status_color = (0, 255, 0)  # 綠色
         cv2.putText(img, status_text, (10, 60), self.fontFace, 0.6, status_color, 2, self.lineType)
 
-    def apply_hand_mosaic(self, img, landmarks, fx, fy, w, h):
-        """對手部區域應用馬賽克"""
+    def apply_hand_mosaic(self, img, hand, w, h, prev_bbox=None):
+        """
+        對手部區域應用馬賽克
+
+        Args:
+            hand: HandDetection
+            prev_bbox: 同一追蹤上一幀的框 (x_min, y_min, x_max, y_max)，用於平滑
+
+        Returns:
+            tuple: 本幀使用的框 (x_min, y_min, x_max, y_max)
+        """
         # 計算馬賽克區域
-        pts = np.array(landmarks, dtype=np.int32)
+        pts = hand.points
         try:
             hull = cv2.convexHull(pts)
             x, y, w_box, h_box = cv2.boundingRect(hull)
         except Exception:
-            x_min, x_max = min(fx), max(fx)
-            y_min, y_max = min(fy), max(fy)
+            x_min, y_min = pts.min(axis=0).tolist()
+            x_max, y_max = pts.max(axis=0).tolist()
             x, y, w_box, h_box = x_min, y_min, x_max - x_min, y_max - y_min
 
         # Padding
@@ -87,17 +142,15 @@ class Visualizer:
         x_min, x_max = max(0, x_min), min(w, x_max)
         y_min, y_max = max(0, y_min), min(h, y_max)
 
-        # Frame-to-frame 平滑
-        if self.prev_bbox is not None:
-            px1, py1, px2, py2 = self.prev_bbox
+        # Frame-to-frame 平滑（只與同一隻手的上一幀混合）
+        if prev_bbox is not None:
+            px1, py1, px2, py2 = prev_bbox
             alpha = BBOX_SMOOTH_ALPHA
             x_min = int(px1 * alpha + x_min * (1 - alpha))
             y_min = int(py1 * alpha + y_min * (1 - alpha))
             x_max = int(px2 * alpha + x_max * (1 - alpha))
             y_max = int(py2 * alpha + y_max * (1 - alpha))
 
-        self.prev_bbox = (x_min, y_min, x_max, y_max)
-
         # 應用馬賽克
         if x_max > x_min and y_max > y_min:
             mosaic_w = x_max - x_min
@@ -117,6 +170,8 @@ class Visualizer:
         # 顯示警告文字
         self._draw_warning_box(img, x_min, y_min, w, h, WARNING_TEXT, WARNING_COLOR)
 
+        return (x_min, y_min, x_max, y_max)
+
     def draw_face_mosaic(self, img, faces):
         """對臉部區域應用馬賽克"""
         for (x, y, face_w, face_h) in faces: